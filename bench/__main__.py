@@ -0,0 +1,47 @@
+import argparse
+import json
+import sys
+
+from bench.micro import compare_results, run_benchmarks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m bench", description="Benchmark the site generator on a synthetic corpus.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run the benchmarks and emit JSON")
+    run.add_argument("--pages", type=int, default=200)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--output", help="write JSON here instead of stdout")
+    compare = commands.add_parser("compare", help="flag regressions against a saved baseline")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown ratio (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_benchmarks(args.pages, args.seed, args.repeat)
+        text = json.dumps(results, indent=2, sort_keys=True)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressions = 0
+    for name, base, best, ratio, status in compare_results(baseline, current, args.threshold):
+        if ratio is None:
+            print(f"{name:<28} {'-':>10} {best * 1000:>10.2f}ms {'':>7} {status}")
+            continue
+        print(f"{name:<28} {base * 1000:>10.2f}ms {best * 1000:>10.2f}ms {ratio:>6.2f}x {status}")
+        regressions += status == "REGRESSION"
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
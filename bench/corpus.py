@@ -0,0 +1,100 @@
+import os
+import random
+
+DEFAULT_MIX = {
+    "paragraph": 6,
+    "heading": 2,
+    "unordered_list": 2,
+    "ordered_list": 1,
+    "quote": 1,
+    "code": 1,
+}
+
+WORDS = [
+    "ring", "elf", "hobbit", "mountain", "river", "shadow", "song", "light",
+    "forest", "road", "tower", "king", "wizard", "dragon", "stone", "star",
+]
+
+
+def synthetic_vocabulary(rng, size):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set(WORDS)
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+class CorpusGenerator():
+    def __init__(self, seed=0, mix=None, blocks_per_page=30, link_rate=0.05, image_rate=0.01, format_rate=0.08, vocabulary=None):
+        self.rng = random.Random(seed)
+        self.vocabulary = WORDS
+        self.cum_weights = None
+        if vocabulary is not None:
+            # Zipf-like word frequencies so posting lists look like real prose.
+            self.vocabulary = synthetic_vocabulary(random.Random(seed), vocabulary)
+            random.Random(seed).shuffle(self.vocabulary)
+            total = 0.0
+            self.cum_weights = []
+            for rank in range(len(self.vocabulary)):
+                total += 1.0 / (rank + 1)
+                self.cum_weights.append(total)
+        self.mix = dict(DEFAULT_MIX if mix is None else mix)
+        self.blocks_per_page = blocks_per_page
+        self.link_rate = link_rate
+        self.image_rate = image_rate
+        self.format_rate = format_rate
+
+    def word(self):
+        if self.cum_weights is None:
+            return self.rng.choice(WORDS)
+        return self.rng.choices(self.vocabulary, cum_weights=self.cum_weights)[0]
+
+    def words(self, count):
+        out = []
+        for _ in range(count):
+            word = self.word()
+            roll = self.rng.random()
+            if roll < self.link_rate:
+                word = f"[{word}](/blog/{self.rng.choice(WORDS)})"
+            elif roll < self.link_rate + self.image_rate:
+                word = f"![{word}](/images/{self.rng.choice(WORDS)}.png)"
+            elif roll < self.link_rate + self.image_rate + self.format_rate:
+                word = self.rng.choice([f"**{word}**", f"_{word}_", f"`{word}`"])
+            out.append(word)
+        return " ".join(out)
+
+    def block(self, kind):
+        if kind == "heading":
+            return "#" * self.rng.randint(2, 4) + " " + self.words(4)
+        if kind == "unordered_list":
+            return "\n".join("- " + self.words(8) for _ in range(self.rng.randint(2, 6)))
+        if kind == "ordered_list":
+            return "\n".join(f"{i}. " + self.words(8) for i in range(1, self.rng.randint(2, 6) + 1))
+        if kind == "quote":
+            return "\n".join("> " + self.words(10) for _ in range(self.rng.randint(1, 4)))
+        if kind == "code":
+            lines = [f"    {self.rng.choice(WORDS)}({self.rng.randint(0, 99)})" for _ in range(self.rng.randint(2, 8))]
+            return "```\n" + "\n".join(lines) + "\n```"
+        return "\n".join(self.words(12) for _ in range(self.rng.randint(1, 5)))
+
+    def page(self, title):
+        kinds = list(self.mix)
+        weights = [self.mix[kind] for kind in kinds]
+        blocks = [f"# {title}"]
+        for kind in self.rng.choices(kinds, weights, k=self.blocks_per_page):
+            blocks.append(self.block(kind))
+        return "\n\n".join(blocks) + "\n"
+
+    def pages(self, count):
+        return [self.page(f"Page {i} " + self.words(3)) for i in range(count)]
+
+    def write_tree(self, root, count, per_directory=50):
+        paths = []
+        for i, markdown in enumerate(self.pages(count)):
+            directory = os.path.join(root, f"section{i // per_directory}", f"page{i}")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, "index.md")
+            with open(path, "w") as f:
+                f.write(markdown)
+            paths.append(path)
+        return paths
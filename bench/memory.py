@@ -0,0 +1,56 @@
+import gc
+import os
+import sys
+import tracemalloc
+
+# Also runnable as python3 bench/memory.py: with the repository root on the
+# path, importing the bench package puts src/ there too.
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from bench.corpus import CorpusGenerator
+from blocks import markdown_to_html_node
+
+
+class DictNode():
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+def to_dict_nodes(node):
+    if node.children is None:
+        return DictNode(node.tag, node.value, None, dict(node.props) if node.props else None)
+    return DictNode(node.tag, None, [to_dict_nodes(child) for child in node.children], dict(node.props) if node.props else None)
+
+
+def count_nodes(node):
+    return 1 + sum(count_nodes(child) for child in node.children or ())
+
+
+def measure(label, build, pages):
+    gc.collect()
+    tracemalloc.start()
+    retained = [build() for _ in range(pages)]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+    print(f"{label:<24} retained {current / 1024:>10.1f} KiB   peak {peak / 1024:>10.1f} KiB")
+    return current
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    markdown = CorpusGenerator(0, blocks_per_page=200).page("Synthetic page")
+    tree = markdown_to_html_node(markdown)
+    print(f"{pages} pages x {count_nodes(tree)} nodes")
+    unslotted = measure("__dict__ nodes", lambda: to_dict_nodes(markdown_to_html_node(markdown)), pages)
+    slotted = measure("slotted nodes", lambda: markdown_to_html_node(markdown), pages)
+    print(f"slotted / __dict__: {slotted / unslotted:.2f}")
+
+
+if __name__ == "__main__":
+    main()
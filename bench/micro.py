@@ -0,0 +1,77 @@
+import contextlib
+import io
+import os
+import platform
+import tempfile
+import time
+
+from bench.corpus import CorpusGenerator
+from blocks import block_to_block_type, markdown_to_blocks, markdown_to_html_node, text_to_children
+from main import generate_pages_recursive
+
+TEMPLATE = "<!doctype html><title>{{ Title }}</title><link href=\"/index.css\" /><article>{{ Content }}</article>"
+
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {"best": min(timings), "mean": sum(timings) / len(timings), "repeat": repeat}
+
+
+def run_benchmarks(pages=200, seed=0, repeat=5, end_to_end_pages=None):
+    generator = CorpusGenerator(seed)
+    documents = generator.pages(pages)
+    blocks = [block for markdown in documents for block in markdown_to_blocks(markdown)]
+    paragraphs = [block for block in blocks if not block.startswith(("#", "```", "- ", "> ", "1. "))]
+    trees = [markdown_to_html_node(markdown) for markdown in documents]
+
+    results = {}
+    results["markdown_to_blocks"] = time_call(lambda: [markdown_to_blocks(markdown) for markdown in documents], repeat)
+    results["block_to_block_type"] = time_call(lambda: [block_to_block_type(block) for block in blocks], repeat)
+    results["text_to_children"] = time_call(lambda: [text_to_children(text) for text in paragraphs], repeat)
+    results["markdown_to_html_node"] = time_call(lambda: [markdown_to_html_node(markdown) for markdown in documents], repeat)
+    results["ParentNode.to_html"] = time_call(lambda: [tree.to_html() for tree in trees], repeat)
+
+    with tempfile.TemporaryDirectory() as root:
+        content = os.path.join(root, "content")
+        CorpusGenerator(seed).write_tree(content, end_to_end_pages or pages)
+        template_path = os.path.join(root, "template.html")
+        with open(template_path, "w") as f:
+            f.write(TEMPLATE)
+        dest = os.path.join(root, "docs")
+        with contextlib.redirect_stdout(io.StringIO()):
+            results["generate_pages_recursive"] = time_call(
+                lambda: generate_pages_recursive(content, template_path, dest, "/"), repeat
+            )
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pages": pages,
+            "seed": seed,
+            "blocks": len(blocks),
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline, current, threshold=0.10):
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            rows.append((name, None, result["best"], None, "new"))
+            continue
+        ratio = result["best"] / base["best"] if base["best"] else float("inf")
+        if ratio > 1 + threshold:
+            status = "REGRESSION"
+        elif ratio < 1 - threshold:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, base["best"], result["best"], ratio, status))
+    return rows
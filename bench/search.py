@@ -0,0 +1,96 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from bench.corpus import CorpusGenerator
+from builder import Site
+from search import SEARCH_DIR
+
+TEMPLATE = "<!doctype html><title>{{ Title }}</title><article>{{ Content }}</article>"
+
+
+def make_site(root, search):
+    import shutil
+    for name in ("docs-search" if search else "docs", "manifest-search.json" if search else "manifest.json"):
+        path = os.path.join(root, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+    return Site(
+        content_dir=os.path.join(root, "content"),
+        static_dir=os.path.join(root, "static"),
+        template_path=os.path.join(root, "template.html"),
+        dest_dir=os.path.join(root, "docs-search" if search else "docs"),
+        manifest_path=os.path.join(root, "manifest-search.json" if search else "manifest.json"),
+        delta_path=None,
+        cache_dir=None,
+        listing_dir=None,
+        search=search,
+    )
+
+
+def timed(func):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func()
+    return time.perf_counter() - start, result
+
+
+def index_sizes(directory):
+    sizes = {name: os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)}
+    shards = [size for name, size in sizes.items() if name != "pages.json"]
+    return sizes["pages.json"], shards
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    vocabulary = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "static"))
+        with open(os.path.join(root, "template.html"), "w") as f:
+            f.write(TEMPLATE)
+        start = time.perf_counter()
+        paths = CorpusGenerator(0, blocks_per_page=12, vocabulary=vocabulary).write_tree(os.path.join(root, "content"), pages)
+        print(f"corpus: {pages} pages, {vocabulary} word vocabulary, written in {time.perf_counter() - start:.1f}s")
+
+        plain = min(timed(make_site(root, False).build)[0] for _ in range(2))
+        full = min(timed(make_site(root, True).build)[0] for _ in range(2))
+        site = make_site(root, True)
+        timed(site.build)
+        index = site.search_index
+        directory = os.path.join(site.dest_dir, SEARCH_DIR)
+        pages_bytes, shards = index_sizes(directory)
+        postings = sum(len(ids) for ids in index.postings.values())
+        print(f"build without search   {plain:8.2f}s")
+        print(f"build with search      {full:8.2f}s  (+{(full - plain) / plain * 100:.1f}%)")
+        print(f"terms                  {len(index.postings):8d}")
+        print(f"postings               {postings:8d}")
+        print(f"pages.json             {pages_bytes / 1024:8.1f} KiB")
+        print(f"shards                 {len(shards):8d}  total {sum(shards) / 1024:.1f} KiB, "
+              f"largest {max(shards) / 1024:.1f} KiB, mean {sum(shards) / len(shards) / 1024:.1f} KiB")
+        print(f"bytes per posting      {sum(shards) / postings:8.2f}")
+
+        with open(paths[len(paths) // 2], "a") as f:
+            f.write("\nAn entirely new zyzzyva paragraph.\n")
+        incremental, _ = timed(site.build)
+        print(f"rebuild after 1 edit   {incremental:8.2f}s")
+        cold = make_site(root, True)
+        cold.manifest = site.manifest
+        warm_index, _ = timed(lambda: cold.update_search(site.manifest, {}, site.manifest.search, _NullDelta()))
+        print(f"index from manifest    {warm_index:8.2f}s  (re-parses every page without saved search state)")
+
+
+class _NullDelta():
+    def record(self, path, status):
+        pass
+
+    def remove(self, path):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import time
+
+from bench import SRC_DIR
+
+STATEMENTS = {
+    "python (baseline)": "pass",
+    "import blocks": "import blocks",
+    "import builder": "import builder",
+    "import main": "import main",
+    "render_markdown": "from builder import Site; Site(cache_dir=None).render_markdown('# Hi\\n\\nSome **text**')",
+}
+
+
+def time_statement(statement, repeat):
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True, env=env)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    baseline = None
+    for label, statement in STATEMENTS.items():
+        best = time_statement(statement, repeat)
+        if baseline is None:
+            baseline = best
+        print(f"{label:<20} {best * 1000:>8.1f}ms  (+{(best - baseline) * 1000:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
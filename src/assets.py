@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+import re
+
+from links import split_url
+from manifest import hash_file
+
+FINGERPRINT_EXTENSIONS = {
+    ".css", ".js", ".mjs", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".avif", ".ico", ".woff", ".woff2", ".ttf",
+}
+DIGEST_LENGTH = 10
+FINGERPRINTED_PATTERN = re.compile(r"^(.*)\.[0-9a-f]{%d}(\.[^./]+)$" % DIGEST_LENGTH)
+
+
+def should_fingerprint(rel_path):
+    return os.path.splitext(rel_path)[1].lower() in FINGERPRINT_EXTENSIONS
+
+
+def fingerprint_path(rel_path, digest):
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:DIGEST_LENGTH]}{ext}"
+
+
+def strip_fingerprint(rel_path):
+    match = FINGERPRINTED_PATTERN.match(rel_path)
+    return match.group(1) + match.group(2) if match else None
+
+
+# A previous fingerprint is reused without hashing when the copy already in
+# dest_dir still matches its source (same size and mtime, as in sync_files).
+def fingerprint_files(static_dir, files, previous=None, dest_dir=None):
+    from sync import is_unchanged
+    previous = previous or {}
+    renames = {}
+    for rel_path in files:
+        if not should_fingerprint(rel_path):
+            continue
+        src_path = os.path.join(static_dir, rel_path)
+        name = previous.get(rel_path)
+        if name is None or dest_dir is None or not is_unchanged(src_path, os.path.join(dest_dir, name)):
+            name = fingerprint_path(rel_path, hash_file(src_path))
+        renames[rel_path] = name
+    return renames
+
+
+class AssetMap():
+    def __init__(self, files=None):
+        self.files = dict(files or {})
+        self.urls = {"/" + src.replace(os.sep, "/"): "/" + dest.replace(os.sep, "/") for src, dest in self.files.items()}
+        self.signature = ""
+        if self.files:
+            self.signature = hashlib.sha256(json.dumps(self.files, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def url(self, value):
+        if not value.startswith("/"):
+            return value
+        path, suffix = split_url(value)
+        mapped = self.urls.get(path)
+        return value if mapped is None else mapped + suffix
+
+    def __len__(self):
+        return len(self.files)
+
+    def __repr__(self):
+        return f"AssetMap({len(self.files)} fingerprinted file(s))"
@@ -0,0 +1,95 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+DEFAULT_CACHE_DIR = "./.cache/blocks"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class BlockCache():
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._load()
+
+    def _load(self):
+        found = []
+        if os.path.isdir(self.directory):
+            for shard in os.scandir(self.directory):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.is_file() and not entry.name.startswith(".tmp-"):
+                        stat = entry.stat()
+                        found.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.size += size
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def key_for(self, source, version):
+        return hashlib.sha256(f"{version}\0{source}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = f.read()
+            os.utime(path)
+        except OSError:
+            self._forget(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        import tempfile
+        data = value.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._forget(key)
+        self._entries[key] = len(data)
+        self.size += len(data)
+        self._evict()
+
+    def _forget(self, key):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self.size -= size
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self.size -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"BlockCache({self.directory}, {len(self._entries)} entries, {self.size} bytes, hits: {self.hits}, misses: {self.misses})"
@@ -1,8 +1,9 @@
 from enum import Enum
 from htmlnode import ParentNode, LeafNode
-from textnode import TextNode, TextType
-from text_to_markdown import split_nodes_delimiter, split_nodes_image, split_nodes_link
-from textnode import text_node_to_html_node
+from textnode import TextType
+from text_to_markdown import tokenize_inline
+from textnode import html_node_for
+from profiler import NULL_PROFILER
 
 class BlockType(Enum):
     paragraph = "paragraph"
@@ -12,55 +13,112 @@ class BlockType(Enum):
     unordered_list = "unordered_list"
     ordered_list = "ordered_list"
 
-def block_to_block_type(block):
-    lines = block.split("\n")
-    if block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
-        return BlockType.heading
-    elif len(lines) > 1 and lines[0].lstrip().startswith("```") and lines[-1].lstrip().startswith("```"):
-        return BlockType.code
-    elif block.startswith("> "):
+RENDERER_VERSION = "3"
+
+# Images in the first few blocks are likely on the first screen and load
+# eagerly; later ones get loading="lazy" when the resolver has image sizes.
+EAGER_IMAGE_BLOCKS = 4
+
+BLOCK_DELIMITERS = (("**", TextType.BOLD), ("_", TextType.ITALIC), ("`", TextType.CODE))
+
+HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
+
+class Block():
+    __slots__ = ("block_type", "level", "start", "end", "lines")
+
+    def __init__(self, block_type, level, start, end, lines):
+        self.block_type = block_type
+        self.level = level
+        self.start = start
+        self.end = end
+        self.lines = lines
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+    def __repr__(self):
+        return f"Block({self.block_type.value}, {self.level}, lines {self.start}-{self.end}, {self.lines})"
+
+def classify_lines(lines):
+    first = lines[0]
+    if first.startswith(HEADING_PREFIXES):
+        return BlockType.heading, heading_level(first)
+    elif len(lines) > 1 and first.lstrip().startswith("```") and lines[-1].lstrip().startswith("```"):
+        return BlockType.code, None
+    elif first.startswith("> "):
         for line in lines:
             if line.strip() == ">":
                 continue
             if not line.startswith("> "):
-                return BlockType.paragraph
-        return BlockType.quote
-    elif block.startswith("- "):
+                return BlockType.paragraph, None
+        return BlockType.quote, None
+    elif first.startswith("- "):
         for line in lines:
             if not line.startswith("- "):
-                return BlockType.paragraph
-        return BlockType.unordered_list
-    elif block.startswith("1. "):
+                return BlockType.paragraph, None
+        return BlockType.unordered_list, None
+    elif first.startswith("1. "):
         i = 1
         for line in lines:
             if not line.startswith(f"{i}. "):
-                return BlockType.paragraph
+                return BlockType.paragraph, None
             i += 1
-        return BlockType.ordered_list
+        return BlockType.ordered_list, None
     else:
-        return BlockType.paragraph
+        return BlockType.paragraph, None
 
+def block_to_block_type(block):
+    return classify_lines(block.split("\n"))[0]
 
+def _make_block(lines, start, end):
+    block_type, level = classify_lines(lines)
+    return Block(block_type, level, start, end, lines)
 
-def markdown_to_blocks(markdown):
-    blocks = []
+def _opens_fence(line):
+    return line.startswith("```") and "```" not in line[3:]
+
+# Walks the document once, line by line, and yields classified blocks.
+# A fence opening a block runs to the next ``` line, blank lines included;
+# an unclosed fence is treated as ordinary text.
+def scan_blocks(markdown):
     lines = markdown.split("\n")
-    current_block = []    
-    for line in lines:
-        if line.strip() == "":
-            if current_block:
-                blocks.append("\n".join(current_block).strip())
-                current_block = []
-        elif line.lstrip().startswith(("# ","## ","### ","#### ","##### ","###### ")):
-            if current_block:
-                blocks.append("\n".join(current_block).strip())
-                current_block = []
-            current_block.append(line.strip())
-        else:
-            current_block.append(line.strip())
-    if current_block:
-        blocks.append("\n".join(current_block).strip())
-    return blocks
+    current = []
+    start = 0
+    fence_closes_at = None
+    fences_exhausted = False
+    for number, raw in enumerate(lines):
+        line = raw.strip()
+        if fence_closes_at is not None:
+            current.append(line)
+            if number == fence_closes_at:
+                yield _make_block(current, start, number + 1)
+                current = []
+                fence_closes_at = None
+            continue
+        if line == "":
+            if current:
+                yield _make_block(current, start, number)
+                current = []
+            continue
+        if not current and not fences_exhausted and _opens_fence(line):
+            for ahead in range(number + 1, len(lines)):
+                if lines[ahead].strip().startswith("```"):
+                    fence_closes_at = ahead
+                    break
+            else:
+                fences_exhausted = True
+        elif raw.lstrip().startswith(HEADING_PREFIXES) and current:
+            yield _make_block(current, start, number)
+            current = []
+        if not current:
+            start = number
+        current.append(line)
+    if current:
+        yield _make_block(current, start, len(lines))
+
+def markdown_to_blocks(markdown):
+    return [block.text for block in scan_blocks(markdown)]
 
 
 def block_type_to_html_tag(block_type):
@@ -79,18 +137,12 @@ def block_type_to_html_tag(block_type):
     else:
         raise Exception(f"Unknown BlockType: {block_type}")
     
-def text_to_children(text):
-    
-
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-
-    html_nodes = [text_node_to_html_node(node) for node in nodes]
-    return html_nodes
+def text_to_children(text, resolve=None, image_props=None):
+    if resolve is None and image_props is None:
+        return tokenize_inline(text, BLOCK_DELIMITERS, html_node_for)
+    def make_node(text, text_type, url=None):
+        return html_node_for(text, text_type, url, resolve, image_props)
+    return tokenize_inline(text, BLOCK_DELIMITERS, make_node)
 
 def heading_level(markdown):
     if markdown.startswith("###### "):
@@ -111,76 +163,146 @@ def heading_level(markdown):
 
 
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
+# When `text` is a list, the plain text of every block is appended to it so
+# callers such as the search indexer never have to parse the page again.
+# Likewise `targets` receives [line, url] for every site-absolute link and
+# image, where line is the first line of its block, numbered from 1 within
+# `markdown`, for the link checker.
+# Cache entries hold "text\0targets\0html" for the same reason. Link and
+# image URLs are resolved through `links` as nodes are built, so blocks
+# containing them also key on the resolver's signature (basepath and asset
+# fingerprints).
+def markdown_to_html_node(markdown, cache=None, profiler=None, text=None, links=None, targets=None):
+    if profiler is None:
+        profiler = NULL_PROFILER
+    resolve = links.resolve if links is not None else None
+    with profiler.stage("blocks"):
+        blocks = list(scan_blocks(markdown))
+    profiler.count("blocks", len(blocks))
     html_nodes = []
-    for block in blocks:       
-        block_type = block_to_block_type(block)
-        if block_type == BlockType.code:
-            inner_lines = block.split("\n")[1:-1]
-            code_text = "\n".join(inner_lines) + "\n"
-            html_nodes.append(
-            ParentNode(
-                tag="pre",
-                children=[LeafNode("code", code_text)],
-            )
-         )
-        elif block_type == BlockType.heading:
-            level = heading_level(block)
-            html_nodes.append(
-                ParentNode(
-                    tag=f"h{level}",
-                    children=text_to_children(block[level + 1 :].strip())
-                )
-            )
-        elif block_type == BlockType.unordered_list:
-            list_items = []
-            for line in block.split("\n"):
-                item_text = line[2:].strip()
-                list_items.append(
-                    ParentNode(
-                        tag="li",
-                        children=text_to_children(item_text)
-                    )
-                )
-            html_nodes.append(
-                ParentNode(
-                    tag="ul",
-                    children=list_items
-                )
-            )
-        elif block_type == BlockType.ordered_list:
-            list_items = []
-            for line in block.split("\n"):
-                item_text = line[line.index(". ") + 2 :].strip()
-                list_items.append(
-                    ParentNode(
-                        tag="li",
-                        children=text_to_children(item_text)
-                    )
-                )
-            html_nodes.append(
+    with profiler.stage("inline"):
+        for index, block in enumerate(blocks):
+            has_links = "](" in block.text
+            image_props = None
+            if has_links and links is not None and links.images is not None:
+                image_props = links.image_props if index < EAGER_IMAGE_BLOCKS else links.lazy_image_props
+            if cache is None:
+                found = [] if targets is not None and has_links else None
+                node = block_to_html_node(block, recording_resolver(resolve, found), image_props)
+                if profiler.enabled:
+                    profiler.count("inline_nodes", count_leaves(node))
+                if text is not None:
+                    text.append(node_text(node))
+                if found:
+                    targets.extend([block.start + 1, url] for url in found)
+                html_nodes.append(node)
+                continue
+            version = RENDERER_VERSION
+            if links is not None and has_links:
+                version += "\0" + links.signature
+                if image_props is not None and index >= EAGER_IMAGE_BLOCKS:
+                    version += "\0lazy"
+            key = cache.key_for(block.text, version)
+            value = cache.get(key)
+            if value is None:
+                found = [] if has_links else None
+                node = block_to_html_node(block, recording_resolver(resolve, found), image_props)
+                if profiler.enabled:
+                    profiler.count("inline_nodes", count_leaves(node))
+                block_text = node_text(node)
+                html = node.to_html()
+                cache.put(key, block_text + "\0" + "\x1f".join(found or ()) + "\0" + html)
+            else:
+                block_text, encoded, html = value.split("\0", 2)
+                found = encoded.split("\x1f") if encoded else None
+            if text is not None:
+                text.append(block_text)
+            if targets is not None and found:
+                targets.extend([block.start + 1, url] for url in found)
+            html_nodes.append(LeafNode(None, html))
+    return ParentNode("div",html_nodes)
+
+def recording_resolver(resolve, found):
+    if found is None:
+        return resolve
+    def record(url):
+        if url.startswith("/") and not url.startswith("//"):
+            found.append(url)
+        return url if resolve is None else resolve(url)
+    return record
+
+
+def count_leaves(node):
+    if node.children is None:
+        return 1
+    return sum(count_leaves(child) for child in node.children)
+
+def node_text(node):
+    parts = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.children is not None:
+            stack.extend(reversed(current.children))
+            continue
+        if current.value:
+            parts.append(current.value)
+        elif current.props and current.props.get("alt"):
+            parts.append(current.props["alt"])
+    return " ".join(parts).replace("\0", " ")
+
+def block_to_html_node(block, resolve=None, image_props=None):
+    block_type = block.block_type
+    if block_type == BlockType.code:
+        inner_lines = block.lines[1:-1]
+        code_text = "\n".join(inner_lines) + "\n"
+        return ParentNode(
+            tag="pre",
+            children=[LeafNode("code", code_text)],
+        )
+    elif block_type == BlockType.heading:
+        level = block.level
+        return ParentNode(
+            tag=f"h{level}",
+            children=text_to_children(block.text[level + 1 :].strip(), resolve, image_props)
+        )
+    elif block_type == BlockType.unordered_list:
+        list_items = []
+        for line in block.lines:
+            item_text = line[2:].strip()
+            list_items.append(
                 ParentNode(
-                    tag="ol",
-                    children=list_items
+                    tag="li",
+                    children=text_to_children(item_text, resolve, image_props)
                 )
             )
-        elif block_type == BlockType.quote:
-            lines = block.split("\n")
-            cleaned_lines = [line[2:].strip() for line in lines if line.startswith("> ")]
-            quote_text = " ".join(cleaned_lines)
-            html_nodes.append(
+        return ParentNode(
+            tag="ul",
+            children=list_items
+        )
+    elif block_type == BlockType.ordered_list:
+        list_items = []
+        for line in block.lines:
+            item_text = line[line.index(". ") + 2 :].strip()
+            list_items.append(
                 ParentNode(
-                    tag="blockquote",
-                    children=text_to_children(quote_text)
+                    tag="li",
+                    children=text_to_children(item_text, resolve, image_props)
                 )
             )
-        else:
-            html_nodes.append(
-            ParentNode(
-                tag=block_type_to_html_tag(block_type),
-                children=text_to_children(block)
-            )
+        return ParentNode(
+            tag="ol",
+            children=list_items
+        )
+    elif block_type == BlockType.quote:
+        cleaned_lines = [line[2:].strip() for line in block.lines if line.startswith("> ")]
+        quote_text = " ".join(cleaned_lines)
+        return ParentNode(
+            tag="blockquote",
+            children=text_to_children(quote_text, resolve, image_props)
+        )
+    else:
+        return ParentNode(
+            tag=block_type_to_html_tag(block_type),
+            children=text_to_children(block.text, resolve, image_props)
         )
-
-    return ParentNode("div",html_nodes)
\ No newline at end of file
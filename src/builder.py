@@ -0,0 +1,790 @@
+import hashlib
+import io
+import os
+import shutil
+from blocks import markdown_to_html_node
+from blockcache import BlockCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from profiler import NULL_PROFILER, Profiler, TimedWriter
+from links import LinkResolver, decode_targets, encode_targets, locate_target
+from manifest import BuildManifest, hash_file, load_manifest, save_manifest
+from listings import DEFAULT_PAGE_SIZE, build_listings, url_for
+from metadata import MetadataCache, find_title, split_front_matter
+from output import DELTA_PATH, HashingWriter, OutputDelta, load_delta, write_if_changed
+from sync import list_files, remove_file, sync_files
+from template import compile_template, load_template
+
+MANIFEST_PATH = "./.build-manifest.json"
+CONTENT_DIR = "./content"
+STATIC_DIR = "./static"
+TEMPLATE_PATH = "./template.html"
+DEST_DIR = "./docs"
+
+class BuildError(Exception):
+    def __init__(self, failures):
+        self.failures = failures
+        lines = [f"{len(failures)} page(s) failed to generate:"]
+        lines.extend(f"  {path}: {error}" for path, error in failures)
+        super().__init__("\n".join(lines))
+
+def clean_docs(dest_dir_path=DEST_DIR):
+    shutil.rmtree(dest_dir_path, ignore_errors=True)
+
+def extract_title(markdown):
+    title = find_title(io.StringIO(markdown))
+    if title is None:
+        raise Exception("Title not found in markdown")
+    return title
+
+def page_title(metadata, markdown):
+    title = metadata.get("title")
+    return title if title else extract_title(markdown)
+
+def generate_page(from_path, template_path, dest_path, basepath=None, template=None, cache=None, profiler=None, text=None, links=None, targets=None):
+    print(f"Generating page from {from_path} to {dest_path} using template {template_path}")
+    return render_page(from_path, template_path, dest_path, basepath, template, cache, profiler, text, links, targets)
+
+def link_resolver(basepath, links=None):
+    if links is None and basepath:
+        links = LinkResolver(basepath)
+    return links
+
+def render_page(from_path, template_path, dest_path, basepath=None, template=None, cache=None, profiler=None, text=None, links=None, targets=None):
+    if profiler is None:
+        profiler = NULL_PROFILER
+    links = link_resolver(basepath, links)
+    with profiler.page(from_path):
+        if template is None:
+            with profiler.stage("template"):
+                template = load_template(template_path, basepath, links)
+        with profiler.stage("read"):
+            with open(from_path, "r") as file:
+                source = file.read()
+        with profiler.stage("title"):
+            metadata, markdown = split_front_matter(source)
+            title = page_title(metadata, markdown)
+        found = [] if targets is not None else None
+        root = markdown_to_html_node(markdown, cache, profiler, text, links, found)
+        if text is not None and metadata.get("title"):
+            text.append(title)
+        if found:
+            header_lines = source.count("\n", 0, len(source) - len(markdown))
+            targets.extend([line + header_lines, url] for line, url in found)
+        out = HashingWriter(dest_path)
+        try:
+            if profiler.enabled:
+                out.sink = TimedWriter(out.sink)
+            with profiler.stage("serialize"):
+                template.write(out, Content=root.write_children_html, Title=title)
+                out.flush()
+            if profiler.enabled:
+                profiler.add("serialize", -out.sink.elapsed)
+                profiler.add("write", out.sink.elapsed)
+            with profiler.stage("write"):
+                status = out.commit()
+        except BaseException:
+            out.discard()
+            raise
+        if profiler.enabled:
+            profiler.count("pages")
+            if status is None:
+                profiler.count("pages_unchanged")
+            else:
+                profiler.count("bytes_written", out.size)
+    return status
+
+_worker_template = None
+_worker_cache = None
+_worker_profile = None
+_worker_links = None
+
+def _init_worker(template, cache_config, profile_config, links=None):
+    global _worker_template, _worker_cache, _worker_profile, _worker_links
+    _worker_template = template
+    _worker_links = links
+    if cache_config is not None:
+        _worker_cache = BlockCache(*cache_config)
+    _worker_profile = profile_config
+
+def _render_page_in_worker(from_path, template_path, dest_path, basepath, collect_terms=False, collect_links=False):
+    cache = _worker_cache
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    profiler = Profiler(*_worker_profile) if _worker_profile is not None else None
+    text = [] if collect_terms else None
+    targets = [] if collect_links else None
+    status = render_page(from_path, template_path, dest_path, basepath, _worker_template, cache, profiler, text, _worker_links, targets)
+    profile = profiler.to_data() if profiler is not None else None
+    terms = None
+    if text is not None:
+        from search import page_terms
+        terms = page_terms(text)
+    if cache is None:
+        return 0, 0, profile, status, terms, targets
+    return cache.hits - hits, cache.misses - misses, profile, status, terms, targets
+
+def collect_pages(dir_path_content, dest_dir_path):
+    pages = []
+    for file in sorted(os.listdir(dir_path_content)):
+        entry = os.path.join(dir_path_content, file) #makes it a full path
+        if os.path.isdir(entry):
+            pages.extend(collect_pages(entry, os.path.join(dest_dir_path, file)))
+        elif os.path.isfile(entry) and entry.endswith(".md"):
+            pages.append((entry, os.path.join(dest_dir_path, file[:-3] + ".html")))
+    return pages
+
+def generate_pages(pages, template_path, basepath=None, jobs=1, cache=None, template=None, profiler=None, delta=None, terms=None, links=None, targets=None):
+    if not pages:
+        return
+    links = link_resolver(basepath, links)
+    if template is None:
+        template = load_template(template_path, basepath, links)
+    if jobs <= 1 or len(pages) <= 1:
+        if terms is not None:
+            from search import page_terms
+        for from_path, dest_path in pages:
+            text = [] if terms is not None else None
+            page_targets = [] if targets is not None else None
+            status = generate_page(from_path, template_path, dest_path, basepath, template, cache, profiler, text, links, page_targets)
+            if targets is not None:
+                targets[from_path] = page_targets
+            if delta is not None:
+                delta.record(dest_path, status)
+            if terms is not None:
+                terms[from_path] = page_terms(text)
+        return
+    failures = []
+    cache_config = (cache.directory, cache.max_bytes) if cache is not None else None
+    profile_config = (profiler.record_events,) if profiler is not None and profiler.enabled else None
+    initargs = (template, cache_config, profile_config, links)
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as executor:
+        futures = [
+            executor.submit(_render_page_in_worker, from_path, template_path, dest_path, basepath, terms is not None, targets is not None)
+            for from_path, dest_path in pages
+        ]
+        for (from_path, dest_path), future in zip(pages, futures):
+            print(f"Generating page from {from_path} to {dest_path} using template {template_path}")
+            try:
+                hits, misses, profile, status, found_terms, page_targets = future.result()
+            except Exception as e:
+                print(f"Error generating {from_path}: {e}")
+                failures.append((from_path, str(e)))
+                continue
+            if delta is not None:
+                delta.record(dest_path, status)
+            if terms is not None:
+                terms[from_path] = found_terms
+            if targets is not None:
+                targets[from_path] = page_targets
+            if cache is not None:
+                cache.hits += hits
+                cache.misses += misses
+            if profile is not None:
+                profiler.merge(profile)
+    if failures:
+        raise BuildError(failures)
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath=None, manifest=None, previous=None, jobs=1, cache=None, profiler=None, template=None, delta=None, shard=None, terms=None, links=None, targets=None):
+    if profiler is None:
+        profiler = NULL_PROFILER
+    pages = collect_pages(dir_path_content, dest_dir_path)
+    if shard is not None:
+        from shard import select_shard
+        pages = select_shard(pages, shard, dir_path_content)
+        print(f"Shard {shard[0]}/{shard[1]}: building {len(pages)} page(s)")
+    pending = []
+    for from_path, dest_path in pages:
+        if manifest is not None:
+            with profiler.stage("hash"):
+                source_hash = hash_file(from_path)
+            manifest.record(from_path, source_hash, dest_path)
+            if manifest.unchanged_since(previous, from_path, source_hash, dest_path):
+                previous_targets = previous.pages[from_path].get("links")
+                if previous_targets is not None:
+                    manifest.pages[from_path]["links"] = previous_targets
+                if targets is None or previous_targets is not None:
+                    print(f"Skipping unchanged page {from_path}")
+                    continue
+        pending.append((from_path, dest_path))
+    generate_pages(pending, template_path, basepath, jobs, cache, template, profiler, delta, terms, links, targets)
+    if manifest is not None and targets is not None:
+        for from_path, page_targets in targets.items():
+            if from_path in manifest.pages and page_targets is not None:
+                manifest.pages[from_path]["links"] = encode_targets(page_targets)
+
+def remove_stale_pages(manifest, previous, dest_dir_path, delta=None):
+    for dest in manifest.stale_outputs(previous):
+        if os.path.exists(dest):
+            print(f"Removing stale page {dest}")
+            if delta is not None:
+                delta.remove(dest)
+        remove_file(dest, dest_dir_path)
+
+def remove_untracked_outputs(manifest, dest_dir_path, delta=None):
+    if not os.path.isdir(dest_dir_path):
+        return
+    tracked = {os.path.normpath(entry["dest"]) for entry in manifest.pages.values()}
+    tracked.update(os.path.normpath(os.path.join(dest_dir_path, path)) for path in manifest.static)
+    tracked.update(os.path.normpath(dest) for dest in manifest.listings)
+    tracked.update(os.path.normpath(path) for path in manifest.search)
+    for rel_path in list_files(dest_dir_path):
+        path = os.path.join(dest_dir_path, rel_path)
+        if path.endswith(".gz") and os.path.normpath(path[:-3]) in tracked:
+            continue
+        if os.path.normpath(path) not in tracked:
+            print(f"Removing untracked output {path}")
+            remove_file(path, dest_dir_path)
+            if delta is not None:
+                delta.remove(path)
+
+def dest_path_for(from_path, dir_path_content, dest_dir_path):
+    relative = os.path.relpath(from_path, dir_path_content)
+    return os.path.join(dest_dir_path, relative[:-3] + ".html")
+
+
+class Site():
+    def __init__(
+        self,
+        content_dir=CONTENT_DIR,
+        static_dir=STATIC_DIR,
+        template_path=TEMPLATE_PATH,
+        dest_dir=DEST_DIR,
+        basepath="/",
+        manifest_path=MANIFEST_PATH,
+        delta_path=DELTA_PATH,
+        cache_dir=DEFAULT_CACHE_DIR,
+        cache_size=DEFAULT_MAX_BYTES,
+        jobs=1,
+        hardlink_static=False,
+        profiler=None,
+        shard=None,
+        gzip_level=None,
+        listing_dir="blog",
+        listing_title="Blog",
+        page_size=DEFAULT_PAGE_SIZE,
+        search=False,
+        fingerprint=False,
+        check_links=False,
+        optimize=False,
+        inline_css_limit=None,
+    ):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.manifest_path = manifest_path
+        self.delta_path = delta_path
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self.jobs = jobs
+        self.hardlink_static = hardlink_static
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        self.shard = shard
+        self.gzip_level = gzip_level
+        self.listing_dir = listing_dir
+        self.listing_title = listing_title
+        self.page_size = page_size
+        self.search = search
+        self.fingerprint = fingerprint
+        self.check_links = check_links
+        self.optimize = optimize
+        self.inline_css_limit = inline_css_limit
+        self.broken_links = []
+        self.failures = []
+        self.search_state_path = None
+        if cache_dir is not None:
+            self.search_state_path = os.path.join(os.path.dirname(os.path.normpath(cache_dir)), "search.json")
+        if shard is not None:
+            from shard import shard_path
+            self.manifest_path = shard_path(manifest_path, *shard)
+            if delta_path is not None:
+                self.delta_path = shard_path(delta_path, *shard)
+            if self.search_state_path is not None:
+                self.search_state_path = shard_path(self.search_state_path, *shard)
+        self.manifest = None
+        self.delta = None
+        self._template = None
+        self._template_source = None
+        self._cache = None
+        self._metadata = None
+        self._search_index = None
+        self._assets = None
+        self._links = None
+        self._images = None
+
+    @property
+    def template(self):
+        if self._template is None:
+            if self.optimize:
+                self._template = compile_template(self.template_source(), self.basepath, self.links)
+            else:
+                self._template = load_template(self.template_path, self.basepath, self.links)
+        return self._template
+
+    # Read (and with --optimize, stylesheet-inlined) once per build; the
+    # template key and the compiled template both start from it.
+    def template_source(self):
+        if self._template_source is None:
+            with open(self.template_path, "r") as file:
+                source = file.read()
+            if self.optimize:
+                from media import INLINE_CSS_LIMIT, inline_stylesheets
+                limit = self.inline_css_limit if self.inline_css_limit is not None else INLINE_CSS_LIMIT
+                source = inline_stylesheets(source, self.static_dir, limit)
+            self._template_source = source
+        return self._template_source
+
+    # With --optimize the rendered template also depends on the inlined
+    # stylesheets and image sizes, so both are folded into its hash.
+    def template_key(self):
+        if not self.optimize:
+            return hash_file(self.template_path)
+        digest = hashlib.sha256(self.template_source().encode("utf-8"))
+        digest.update(self.links.signature.encode("utf-8"))
+        return digest.hexdigest()
+
+    @property
+    def images(self):
+        if self.optimize and self._images is None:
+            from media import ImageSizeCache, image_sizes
+            path = None
+            if self.cache_dir is not None:
+                path = os.path.join(os.path.dirname(os.path.normpath(self.cache_dir)), "images.json")
+            cache = ImageSizeCache(path)
+            files = list_files(self.static_dir) if os.path.isdir(self.static_dir) else []
+            self._images = image_sizes(self.static_dir, files, cache)
+            cache.save(prune=True)
+        return self._images
+
+    # The table of every URL the site serves is only needed to tell broken
+    # links apart, so single-page renders don't walk the whole site for it.
+    @property
+    def links(self):
+        if self._links is None:
+            paths = self.site_paths() if self.check_links else None
+            self._links = LinkResolver(self.basepath, paths, self.assets, self.images)
+        return self._links
+
+    def site_paths(self):
+        dests = [dest_path for _, dest_path in collect_pages(self.content_dir, self.dest_dir)] if os.path.isdir(self.content_dir) else []
+        dests.extend(page.dest for page in self.listing_pages())
+        paths = set()
+        for dest_path in dests:
+            url = url_for(dest_path, self.dest_dir)
+            paths.add(url)
+            if url.endswith("/"):
+                paths.add(url + "index.html")
+        if os.path.isdir(self.static_dir):
+            paths.update("/" + rel_path.replace(os.sep, "/") for rel_path in list_files(self.static_dir))
+        return paths
+
+    @property
+    def assets(self):
+        if self.fingerprint and self._assets is None:
+            self._assets = self.load_assets()
+        return self._assets
+
+    def load_assets(self, previous=None):
+        from assets import AssetMap, fingerprint_files
+        if not os.path.isdir(self.static_dir):
+            return AssetMap()
+        files = fingerprint_files(self.static_dir, list_files(self.static_dir), previous, self.dest_dir)
+        return AssetMap(files)
+
+    @property
+    def metadata(self):
+        if self._metadata is None:
+            path = None
+            if self.cache_dir is not None:
+                path = os.path.join(os.path.dirname(os.path.normpath(self.cache_dir)), "metadata.json")
+            self._metadata = MetadataCache(path)
+        return self._metadata
+
+    @property
+    def search_index(self):
+        if self._search_index is None:
+            from search import SearchIndex, load_search_index
+            index = load_search_index(self.search_state_path) if self.search_state_path is not None else None
+            self._search_index = index if index is not None else SearchIndex()
+        return self._search_index
+
+    @property
+    def cache(self):
+        if self._cache is None and self.cache_dir is not None:
+            self._cache = BlockCache(self.cache_dir, self.cache_size)
+        return self._cache
+
+    def render_markdown(self, markdown):
+        root = markdown_to_html_node(markdown, self.cache, self.profiler, links=self.links)
+        parts = []
+        root.write_children_html(parts.append)
+        return "".join(parts)
+
+    def render_page(self, from_path):
+        with open(from_path, "r") as file:
+            markdown = file.read()
+        metadata, markdown = split_front_matter(markdown)
+        return self.template.render(Content=self.render_markdown(markdown), Title=page_title(metadata, markdown))
+
+    def page_metadata(self, from_path, source_hash=None):
+        metadata = self.metadata.get(from_path, source_hash)
+        metadata["path"] = from_path
+        metadata["dest"] = self.dest_path_for(from_path)
+        return metadata
+
+    def collection(self, subdir=""):
+        root = os.path.join(self.content_dir, subdir) if subdir else self.content_dir
+        if not os.path.isdir(root):
+            return []
+        pages = [self.page_metadata(from_path) for from_path, _ in collect_pages(root, self.dest_dir)]
+        self.metadata.save()
+        return pages
+
+    def dest_path_for(self, from_path):
+        return dest_path_for(from_path, self.content_dir, self.dest_dir)
+
+    def listing_pages(self, manifest=None):
+        if not self.listing_dir:
+            return []
+        root = os.path.join(self.content_dir, self.listing_dir)
+        if not os.path.isdir(root):
+            return []
+        entries = manifest.pages if manifest is not None else {}
+        posts = []
+        for from_path, _ in collect_pages(root, self.dest_dir):
+            if from_path == os.path.join(root, "index.md"):
+                continue
+            entry = entries.get(from_path)
+            post = self.page_metadata(from_path, entry["hash"] if entry is not None else None)
+            post["url"] = url_for(post["dest"], self.dest_dir)
+            posts.append(post)
+        self.metadata.save()
+        pages = build_listings(posts, self.dest_dir, self.listing_dir, self.listing_title, self.page_size)
+        return [page for page in pages if not os.path.isfile(self.source_path_for(page.dest))]
+
+    def source_path_for(self, dest_path):
+        relative = os.path.relpath(dest_path, self.dest_dir)
+        return os.path.join(self.content_dir, relative[:-5] + ".md")
+
+    def render_listing(self, page):
+        node = page.to_html_node(self.links.resolve)
+        parts = []
+        self.template.write(parts.append, Content=node.write_children_html, Title=page.title)
+        return "".join(parts)
+
+    def generate_listings(self, manifest, previous_listings, delta):
+        if self.shard is not None and self.shard[0] != 1:
+            return
+        listings = {}
+        with self.profiler.stage("listings"):
+            for page in self.listing_pages(manifest):
+                signature = page.signature(manifest.template_hash, self.basepath, manifest.assets)
+                listings[page.dest] = signature
+                if previous_listings.get(page.dest) == signature and os.path.exists(page.dest):
+                    continue
+                print(f"Generating listing page {page.dest}")
+                delta.record(page.dest, write_if_changed(page.dest, self.render_listing(page).encode("utf-8")))
+            for dest in sorted(set(previous_listings) - set(listings)):
+                print(f"Removing stale listing page {dest}")
+                remove_file(dest, self.dest_dir)
+                delta.remove(dest)
+        manifest.listings = listings
+
+    def build(self):
+        previous = self.manifest or load_manifest(self.manifest_path)
+        delta = OutputDelta(self.dest_dir)
+        previous_static = previous.static if previous is not None else []
+        renames = {}
+        if self.fingerprint:
+            with self.profiler.stage("fingerprint"):
+                self._assets = self.load_assets(previous.assets if previous is not None else None)
+            renames = self._assets.files
+        self._links = None
+        self._images = None
+        self._template_source = None
+        static_files = []
+        if self.shard is None or self.shard[0] == 1:
+            with self.profiler.stage("static"):
+                static_files = sync_files(
+                    self.static_dir, self.dest_dir, previous_static, hardlink=self.hardlink_static, delta=delta, renames=renames,
+                )
+        self._template = None
+        manifest = BuildManifest(self.template_key(), self.basepath, static=static_files, assets=renames)
+        if self.shard is not None:
+            manifest.shard = list(self.shard)
+        terms = {} if self.search else None
+        targets = {} if self.check_links else None
+        generate_pages_recursive(
+            self.content_dir, self.template_path, self.dest_dir, self.basepath,
+            manifest, previous, self.jobs, self.cache, self.profiler, self.template, delta, self.shard, terms, self.links, targets,
+        )
+        self.report_broken_links(manifest)
+        self.generate_listings(manifest, previous.listings if previous is not None else {}, delta)
+        self.update_search(manifest, terms, previous.search if previous is not None else [], delta)
+        if self.shard is None:
+            if previous is None:
+                remove_untracked_outputs(manifest, self.dest_dir, delta)
+            else:
+                remove_stale_pages(manifest, previous, self.dest_dir, delta)
+        self.compress_outputs(manifest, delta, self.output_paths(previous), previous.uncompressed if previous is not None else {})
+        save_manifest(manifest, self.manifest_path)
+        self.manifest = manifest
+        self.save_delta(delta)
+        if self.cache is not None:
+            print(f"Block cache: {self.cache.hits} hits, {self.cache.misses} misses")
+        return manifest
+
+    def rebuild(self, changed):
+        if self.manifest is None:
+            return self.build()
+        manifest = self.manifest
+        previous_outputs = self.output_paths(manifest) if self.gzip_level is not None else []
+        delta = OutputDelta(self.dest_dir)
+        template_changed = self.template_path in changed
+        static_changed = any(path.startswith(self.static_dir + os.sep) for path in changed)
+        if template_changed:
+            print(f"Template {self.template_path} changed, re-rendering every page")
+            self._template = None
+            self._template_source = None
+            pages = collect_pages(self.content_dir, self.dest_dir)
+        else:
+            pages = [
+                (path, self.dest_path_for(path))
+                for path in sorted(changed)
+                if path.startswith(self.content_dir + os.sep) and path.endswith(".md") and os.path.isfile(path)
+            ]
+        if static_changed:
+            renames = {}
+            if self.fingerprint:
+                self._assets = self.load_assets(manifest.assets)
+                renames = self._assets.files
+            manifest.static = sync_files(
+                self.static_dir, self.dest_dir, manifest.static, hardlink=self.hardlink_static, delta=delta, renames=renames,
+            )
+            self._links = None
+            self._images = None
+            if renames != manifest.assets:
+                print("Static asset fingerprints changed, re-rendering every page")
+                manifest.assets = renames
+                self._template = None
+                pages = collect_pages(self.content_dir, self.dest_dir)
+            if self.optimize:
+                self._template_source = None
+        if template_changed or (static_changed and self.optimize):
+            template_key = self.template_key()
+            if template_key != manifest.template_hash:
+                if not template_changed:
+                    print("Inlined stylesheets or image sizes changed, re-rendering every page")
+                    pages = collect_pages(self.content_dir, self.dest_dir)
+                manifest.template_hash = template_key
+                self._template = None
+        if any(path.endswith(".md") and (path not in manifest.pages or not os.path.exists(path)) for path in changed):
+            self._links = None
+        for path in sorted(changed):
+            if path in manifest.pages and not os.path.exists(path):
+                dest = manifest.pages.pop(path)["dest"]
+                print(f"Removing stale page {dest}")
+                remove_file(dest, self.dest_dir)
+                delta.remove(dest)
+        failures = []
+        terms = {} if self.search else None
+        targets = {} if self.check_links else None
+        try:
+            generate_pages(pages, self.template_path, self.basepath, self.jobs, self.cache, self.template, self.profiler, delta, terms, self.links, targets)
+        except BuildError as e:
+            failures = e.failures
+        except Exception as e:
+            print(f"Error: {e}")
+            failures = [(path, str(e)) for path, _ in pages]
+        self.failures = failures
+        failed = {path for path, _ in failures}
+        for from_path, dest_path in pages:
+            if from_path not in failed:
+                manifest.record(from_path, hash_file(from_path), dest_path)
+                if targets is not None and targets.get(from_path) is not None:
+                    manifest.pages[from_path]["links"] = encode_targets(targets[from_path])
+        self.report_broken_links(manifest)
+        self.generate_listings(manifest, manifest.listings, delta)
+        self.update_search(manifest, terms, manifest.search, delta)
+        self.compress_outputs(manifest, delta, previous_outputs, manifest.uncompressed)
+        save_manifest(manifest, self.manifest_path)
+        self.save_delta(delta)
+        return manifest
+
+    def merge_shards(self, count):
+        from shard import merge_manifests, shard_path
+        partials = {index: load_manifest(shard_path(self.manifest_path, index, count)) for index in range(1, count + 1)}
+        expected = [from_path for from_path, _ in collect_pages(self.content_dir, self.dest_dir)]
+        manifest = merge_manifests(partials, count, expected)
+        self.report_broken_links(manifest)
+        previous = load_manifest(self.manifest_path)
+        delta = OutputDelta(self.dest_dir)
+        if self.delta_path is not None:
+            for index in range(1, count + 1):
+                partial = load_delta(shard_path(self.delta_path, index, count), self.dest_dir)
+                if partial is not None:
+                    delta.added.extend(partial.added)
+                    delta.changed.extend(partial.changed)
+                    delta.removed.extend(partial.removed)
+        if self.search:
+            from search import load_search_index
+            terms = {}
+            if self.search_state_path is not None:
+                for index in range(1, count + 1):
+                    partial = load_search_index(shard_path(self.search_state_path, index, count))
+                    if partial is None:
+                        continue
+                    for source, page in partial.pages.items():
+                        if source in manifest.pages and manifest.pages[source]["hash"] == page["hash"]:
+                            terms[source] = page["terms"]
+            self.update_search(manifest, terms, previous.search if previous is not None else [], delta)
+        if previous is None:
+            remove_untracked_outputs(manifest, self.dest_dir, delta)
+        else:
+            remove_stale_pages(manifest, previous, self.dest_dir, delta)
+        self.compress_outputs(manifest, delta, self.output_paths(previous), previous.uncompressed if previous is not None else {})
+        save_manifest(manifest, self.manifest_path)
+        self.manifest = manifest
+        print(f"Merged {count} shard manifest(s) covering {len(manifest.pages)} page(s)")
+        self.save_delta(delta)
+        return manifest
+
+    def report_broken_links(self, manifest):
+        if not self.check_links:
+            return []
+        links = self.links
+        known = {}
+        broken = []
+        checked = 0
+        with self.profiler.stage("links"):
+            for source in sorted(manifest.pages):
+                for line, url in decode_targets(manifest.pages[source].get("links")):
+                    checked += 1
+                    found = known.get(url)
+                    if found is None:
+                        found = known[url] = links.is_known(url)
+                    if not found:
+                        broken.append((source, locate_target(source, line, url), url))
+        for source, line, url in broken:
+            print(f"{source}:{line}: broken link to {url}")
+        print(f"Checked {checked} internal link(s) in {len(manifest.pages)} page(s): {len(broken)} broken")
+        self.broken_links = broken
+        return broken
+
+    def page_terms(self, from_path):
+        with open(from_path, "r") as file:
+            markdown = file.read()
+        metadata, markdown = split_front_matter(markdown)
+        text = [metadata["title"]] if metadata.get("title") else []
+        markdown_to_html_node(markdown, self.cache, None, text, self.links)
+        from search import page_terms
+        return page_terms(text)
+
+    def update_search(self, manifest, terms, previous_search, delta):
+        if not self.search:
+            for path in previous_search:
+                if os.path.exists(path):
+                    remove_file(path, self.dest_dir)
+                    delta.remove(path)
+            return
+        from search import SEARCH_DIR
+        index = self.search_index
+        directory = os.path.join(self.dest_dir, SEARCH_DIR)
+        with self.profiler.stage("search"):
+            if self.shard is None and not os.path.exists(os.path.join(directory, "pages.json")):
+                index.mark_all_dirty()
+            for source in sorted(manifest.pages):
+                entry = manifest.pages[source]
+                page_terms = (terms or {}).get(source)
+                if page_terms is None:
+                    page_terms = index.terms_for(source, entry["hash"])
+                if page_terms is None:
+                    page_terms = self.page_terms(source)
+                url = self.basepath.rstrip("/") + url_for(entry["dest"], self.dest_dir)
+                title = self.page_metadata(source, entry["hash"]).get("title", url)
+                index.update(source, entry["hash"], url, title, page_terms)
+            for source in [source for source in index.pages if source not in manifest.pages]:
+                index.remove(source)
+            if self.shard is None:
+                written = index.write(directory, delta)
+                manifest.search = index.outputs(directory)
+                for path in sorted(set(previous_search) - set(manifest.search)):
+                    if os.path.exists(path):
+                        remove_file(path, self.dest_dir)
+                        delta.remove(path)
+                print(f"Search index: {len(index)} pages, {len(index.postings)} terms, {written} file(s) written")
+        self.metadata.save()
+        if index.changed and self.search_state_path is not None:
+            index.save(self.search_state_path)
+
+    def output_paths(self, manifest):
+        if manifest is None:
+            return []
+        paths = [entry["dest"] for entry in manifest.pages.values()]
+        paths.extend(os.path.join(self.dest_dir, path) for path in manifest.static)
+        paths.extend(manifest.listings)
+        paths.extend(manifest.search)
+        return paths
+
+    def compress_outputs(self, manifest, delta, previous_outputs=(), uncompressed=None):
+        if self.gzip_level is None:
+            return
+        from compress import compress_files, remove_orphaned_gzip
+        paths = self.output_paths(manifest)
+        current = set(paths)
+        skipped = {path: mtime for path, mtime in (uncompressed or {}).items() if path in current}
+        with self.profiler.stage("gzip"):
+            written = compress_files(paths, self.gzip_level, delta=delta, skipped=skipped)
+            manifest.uncompressed = skipped
+            if self.shard is None:
+                remove_orphaned_gzip(previous_outputs, paths, self.dest_dir, delta)
+        print(f"Compressed {written} file(s) at gzip level {self.gzip_level}")
+
+    def save_delta(self, delta):
+        self.delta = delta
+        if self.delta_path is not None:
+            delta.save(self.delta_path)
+        print(f"Output delta: {len(delta.added)} added, {len(delta.changed)} changed, {len(delta.removed)} removed")
+
+    # Forgetting a page's source hash (rather than the whole manifest) makes
+    # the next build re-render it while still knowing which outputs it owns.
+    def invalidate(self, path=None):
+        if self.manifest is None:
+            self.manifest = load_manifest(self.manifest_path)
+        if self.manifest is None:
+            self.reset()
+            return
+        if path is not None:
+            if path in self.manifest.pages:
+                self.manifest.pages[path]["hash"] = None
+            return
+        for entry in self.manifest.pages.values():
+            entry["hash"] = None
+        self.manifest.listings = dict.fromkeys(self.manifest.listings)
+        self.reset()
+
+    def reset(self):
+        self._template = None
+        self._template_source = None
+        self._cache = None
+        self._metadata = None
+        self._search_index = None
+        self._assets = None
+        self._links = None
+        self._images = None
+
+    def watch(self, interval=0.5):
+        from watch import watch
+        if self.manifest is None:
+            self.build()
+        def on_change(changed):
+            self.rebuild(changed)
+            print(f"Rebuilt {len(changed)} changed path(s); watching for changes")
+        print(f"Watching {self.content_dir}, {self.static_dir} and {self.template_path} for changes (Ctrl+C to stop)")
+        try:
+            watch([self.content_dir, self.static_dir, self.template_path], on_change, interval)
+        except KeyboardInterrupt:
+            print("Stopped watching")
+
+    def __repr__(self):
+        return f"Site({self.content_dir} -> {self.dest_dir}, basepath: {self.basepath})"
@@ -0,0 +1,39 @@
+import argparse
+import json
+import sys
+
+from daemon import DEFAULT_SOCKET_PATH, send_command
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send a command to a running build daemon (main.py --daemon).")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help=f"daemon socket path (default: {DEFAULT_SOCKET_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("build", help="run an incremental build")
+    render = commands.add_parser("render", help="re-render a single content file")
+    render.add_argument("path")
+    invalidate = commands.add_parser("invalidate", help="make the next build re-render every page, or a single page")
+    invalidate.add_argument("path", nargs="?")
+    commands.add_parser("stats", help="print daemon statistics")
+    commands.add_parser("shutdown", help="stop the daemon")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    request = {"command": args.command}
+    if getattr(args, "path", None):
+        request["path"] = args.path
+    try:
+        result = send_command(request, args.socket)
+    except OSError as e:
+        print(f"Could not reach build daemon on {args.socket}: {e}", file=sys.stderr)
+        return 2
+    if not result.pop("ok"):
+        print(f"Error: {result['error']}", file=sys.stderr)
+        return 1
+    result.pop("type")
+    if result:
+        print(json.dumps(result, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import os
+
+from output import ADDED, CHANGED, write_bytes_atomic
+from sync import remove_file
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".svg", ".json", ".txt", ".xml")
+DEFAULT_LEVEL = 9
+
+
+def is_compressible(path):
+    return path.endswith(COMPRESSIBLE_EXTENSIONS)
+
+
+# skipped maps outputs whose gzip came out no smaller to the source mtime
+# that was tried, so an unchanged output is not recompressed every build.
+def gzip_file(path, level=DEFAULT_LEVEL, skipped=None):
+    import gzip
+    gz_path = path + ".gz"
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    try:
+        if os.stat(gz_path).st_mtime_ns == stat.st_mtime_ns:
+            return None
+        status = CHANGED
+    except FileNotFoundError:
+        status = ADDED
+        if skipped is not None and skipped.get(path) == stat.st_mtime_ns:
+            return None
+    with open(path, "rb") as f:
+        data = f.read()
+    compressed = gzip.compress(data, compresslevel=level, mtime=0)
+    if len(compressed) >= len(data):
+        if skipped is not None:
+            skipped[path] = stat.st_mtime_ns
+        if status == CHANGED:
+            os.remove(gz_path)
+            return "removed"
+        return None
+    if skipped is not None:
+        skipped.pop(path, None)
+    write_bytes_atomic(gz_path, compressed)
+    os.utime(gz_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    return status
+
+
+def compress_files(paths, level=DEFAULT_LEVEL, jobs=None, delta=None, skipped=None):
+    from concurrent.futures import ThreadPoolExecutor
+    paths = [path for path in paths if is_compressible(path)]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        statuses = list(executor.map(lambda path: gzip_file(path, level, skipped), paths))
+    written = 0
+    for path, status in zip(paths, statuses):
+        if status is None:
+            continue
+        if status == "removed":
+            print(f"Removing {path}.gz (no smaller than {path})")
+            if delta is not None:
+                delta.remove(path + ".gz")
+            continue
+        written += 1
+        if delta is not None:
+            delta.record(path + ".gz", status)
+    return written
+
+
+# Only .gz siblings of outputs the build used to produce are pruned, so a
+# static file that is itself gzipped (data.tar.gz) is never touched.
+def remove_orphaned_gzip(previous_outputs, outputs, dest_dir, delta=None):
+    current = {os.path.normpath(path) for path in outputs}
+    for path in sorted({os.path.normpath(path) for path in previous_outputs} - current):
+        gz_path = path + ".gz"
+        if gz_path in current or not os.path.exists(gz_path):
+            continue
+        print(f"Removing orphaned {gz_path}")
+        remove_file(gz_path, dest_dir)
+        if delta is not None:
+            delta.remove(gz_path)
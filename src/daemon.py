@@ -0,0 +1,139 @@
+import contextlib
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+DEFAULT_SOCKET_PATH = "./.build.sock"
+
+
+class _SocketLog():
+    def __init__(self, send):
+        self.send = send
+        self.buffer = ""
+
+    def write(self, text):
+        self.buffer += text
+        while "\n" in self.buffer:
+            line, self.buffer = self.buffer.split("\n", 1)
+            self.send({"type": "log", "message": line})
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class BuildDaemon():
+    def __init__(self, site):
+        self.site = site
+        self.started = time.time()
+        self.requests = 0
+        self.server = None
+
+    def handle(self, request):
+        self.requests += 1
+        command = request.get("command")
+        if command == "build":
+            manifest = self.site.build()
+            return {"pages": len(manifest.pages)}
+        if command == "render":
+            path = self.content_path(request["path"])
+            self.site.rebuild({path})
+            result = {"path": path, "dest": self.site.dest_path_for(path)}
+            if self.site.failures:
+                result["ok"] = False
+                result["error"] = "; ".join(f"{failed}: {error}" for failed, error in self.site.failures)
+                result["failed"] = [failed for failed, _ in self.site.failures]
+            return result
+        if command == "invalidate":
+            path = request.get("path")
+            self.site.invalidate(self.content_path(path) if path else None)
+            return {}
+        if command == "stats":
+            return self.stats()
+        if command == "shutdown":
+            if self.server is not None:
+                threading.Thread(target=self.server.shutdown).start()
+            return {}
+        raise ValueError(f"unknown command: {command}")
+
+    def content_path(self, path):
+        relative = os.path.relpath(os.path.abspath(path), os.path.abspath(self.site.content_dir))
+        if relative.startswith(os.pardir):
+            raise ValueError(f"{path} is not inside {self.site.content_dir}")
+        return os.path.join(self.site.content_dir, relative)
+
+    def stats(self):
+        site = self.site
+        cache = site._cache
+        return {
+            "uptime": round(time.time() - self.started, 3),
+            "requests": self.requests,
+            "pages": len(site.manifest.pages) if site.manifest is not None else 0,
+            "template_loaded": site._template is not None,
+            "cache_hits": cache.hits if cache is not None else 0,
+            "cache_misses": cache.misses if cache is not None else 0,
+            "cache_entries": len(cache) if cache is not None else 0,
+        }
+
+
+def _socket_in_use(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def create_server(daemon, socket_path=DEFAULT_SOCKET_PATH):
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            def send(message):
+                self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+                self.wfile.flush()
+            try:
+                request = json.loads(self.rfile.readline())
+                with contextlib.redirect_stdout(_SocketLog(send)):
+                    result = daemon.handle(request)
+                send({"type": "result", "ok": True, **result})
+            except Exception as e:
+                send({"type": "result", "ok": False, "error": str(e)})
+
+    if os.path.exists(socket_path):
+        if _socket_in_use(socket_path):
+            raise RuntimeError(f"a build daemon is already listening on {socket_path}")
+        os.remove(socket_path)
+    server = socketserver.UnixStreamServer(socket_path, Handler)
+    daemon.server = server
+    return server
+
+
+def serve(site, socket_path=DEFAULT_SOCKET_PATH):
+    server = create_server(BuildDaemon(site), socket_path)
+    print(f"Build daemon listening on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        print("Build daemon stopped")
+
+
+def send_command(request, socket_path=DEFAULT_SOCKET_PATH, on_log=print):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with client.makefile("r", encoding="utf-8") as stream:
+            for line in stream:
+                message = json.loads(line)
+                if message["type"] == "log":
+                    on_log(message["message"])
+                else:
+                    return message
+    raise ConnectionError("build daemon closed the connection without a result")
@@ -0,0 +1,275 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from builder import collect_pages
+from sync import list_files
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8888
+DEFAULT_MAX_PAGES = 256
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+# If-None-Match uses the weak comparison: W/"x" and "x" match each other.
+def etag_matches(header, etag):
+    if not header:
+        return False
+    etag = etag[2:] if etag.startswith("W/") else etag
+    for value in header.split(","):
+        value = value.strip()
+        if value == "*" or (value[2:] if value.startswith("W/") else value) == etag:
+            return True
+    return False
+
+
+class PageCache():
+    def __init__(self, max_pages=DEFAULT_MAX_PAGES):
+        self.max_pages = max_pages
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, key):
+        entry = self.entries.get(path)
+        if entry is None or entry[0] != key:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(path)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def put(self, path, key, body):
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.entries[path] = (key, body, etag)
+        self.entries.move_to_end(path)
+        while len(self.entries) > self.max_pages:
+            self.entries.popitem(last=False)
+        return body, etag
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class DevServer():
+    def __init__(self, site, max_pages=DEFAULT_MAX_PAGES):
+        self.site = site
+        self.pages = PageCache(max_pages)
+        self.site_key = None
+        self.listings = []
+        self.listings_key = None
+        self.lock = threading.Lock()
+
+    def site_path(self, url_path):
+        path = unquote(urlsplit(url_path).path)
+        basepath = self.site.basepath or "/"
+        if not basepath.endswith("/"):
+            basepath += "/"
+        if path + "/" == basepath:
+            path = basepath
+        if not path.startswith(basepath):
+            return None
+        parts = [part for part in path[len(basepath):].split("/") if part]
+        if any(part in (os.curdir, os.pardir) for part in parts):
+            return None
+        return "/".join(parts), path.endswith("/") or not parts
+
+    def source_for(self, relative, is_dir):
+        content_dir = self.site.content_dir
+        if is_dir:
+            candidates = [os.path.join(content_dir, relative, "index.md")]
+        elif relative.endswith(".html"):
+            stem = relative[:-5]
+            candidates = [os.path.join(content_dir, stem + ".md")]
+            if os.path.basename(stem) == "index":
+                candidates.append(os.path.join(content_dir, os.path.dirname(stem), "index.md"))
+        else:
+            candidates = [
+                os.path.join(content_dir, relative + ".md"),
+                os.path.join(content_dir, relative, "index.md"),
+            ]
+        for candidate in candidates:
+            if os.path.isfile(candidate):
+                return os.path.normpath(candidate)
+        return None
+
+    def static_for(self, relative):
+        if not relative:
+            return None
+        path = os.path.join(self.site.static_dir, relative)
+        if os.path.isfile(path):
+            return path
+        if self.site.fingerprint:
+            from assets import strip_fingerprint
+            original = strip_fingerprint(relative)
+            if original is not None:
+                path = os.path.join(self.site.static_dir, original)
+                return path if os.path.isfile(path) else None
+        return None
+
+    def resolve(self, url_path):
+        resolved = self.site_path(url_path)
+        if resolved is None:
+            return None, None
+        relative, is_dir = resolved
+        static = None if is_dir else self.static_for(relative)
+        if static is not None:
+            return "static", static
+        source = self.source_for(relative, is_dir)
+        if source is not None:
+            return "page", source
+        listing = self.listing_for(relative, is_dir)
+        if listing is not None:
+            return "listing", listing
+        return None, None
+
+    def listing_for(self, relative, is_dir):
+        listing_dir = (self.site.listing_dir or "").replace(os.sep, "/").strip("/")
+        if not listing_dir or not (relative == listing_dir or relative.startswith(listing_dir + "/")):
+            return None
+        if is_dir or not relative.endswith(".html"):
+            relative = os.path.join(relative, "index.html")
+        dest = os.path.normpath(os.path.join(self.site.dest_dir, relative))
+        with self.lock:
+            pages = self.listing_pages()
+        for page in pages:
+            if os.path.normpath(page.dest) == dest:
+                return page
+        return None
+
+    # Listing pages need the metadata of every post, so they are only rebuilt
+    # when a post under the listing directory is added, removed or changed.
+    def listing_pages(self):
+        root = os.path.join(self.site.content_dir, self.site.listing_dir)
+        key = tuple((path, _stat_key(path)) for path, _ in collect_pages(root, self.site.dest_dir)) if os.path.isdir(root) else ()
+        if key != self.listings_key:
+            self.listings = self.site.listing_pages()
+            self.listings_key = key
+        return self.listings
+
+    # With --fingerprint or --optimize, pages also depend on the static tree
+    # (asset hashes, image sizes, inlined stylesheets), not just the template.
+    def static_key(self):
+        static_dir = self.site.static_dir
+        if not (self.site.fingerprint or self.site.optimize) or not os.path.isdir(static_dir):
+            return None
+        return tuple((rel_path, _stat_key(os.path.join(static_dir, rel_path))) for rel_path in list_files(static_dir))
+
+    def check_site(self):
+        site_key = (_stat_key(self.site.template_path), self.static_key())
+        if site_key != self.site_key:
+            self.site.reset()
+            self.pages.clear()
+            self.site_key = site_key
+
+    def render(self, source):
+        with self.lock:
+            self.check_site()
+            key = _stat_key(source)
+            cached = self.pages.get(source, key)
+            if cached is not None:
+                return cached
+            print(f"Rendering {source}")
+            body = self.site.render_page(source).encode("utf-8")
+            return self.pages.put(source, key, body)
+
+    def render_listing(self, page):
+        with self.lock:
+            self.check_site()
+            key = page.signature()
+            cached = self.pages.get(page.dest, key)
+            if cached is not None:
+                return cached
+            print(f"Rendering listing {page.dest}")
+            body = self.site.render_listing(page).encode("utf-8")
+            return self.pages.put(page.dest, key, body)
+
+
+def create_server(dev, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    import mimetypes
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.respond(send_body=True)
+
+        def do_HEAD(self):
+            self.respond(send_body=False)
+
+        def respond(self, send_body):
+            kind, path = dev.resolve(self.path)
+            if kind is None:
+                self.send_text(404, "Not found", send_body)
+                return
+            try:
+                if kind == "page":
+                    body, etag = dev.render(path)
+                    content_type = "text/html; charset=utf-8"
+                elif kind == "listing":
+                    body, etag = dev.render_listing(path)
+                    content_type = "text/html; charset=utf-8"
+                else:
+                    mtime_ns, size = _stat_key(path)
+                    etag = f'W/"{mtime_ns:x}-{size:x}"'
+                    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                    body = None
+            except Exception as e:
+                print(f"Error serving {self.path}: {e}")
+                self.send_text(500, f"Error rendering {path}: {e}", send_body)
+                return
+            if etag_matches(self.headers.get("If-None-Match"), etag):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            if body is None:
+                try:
+                    with open(path, "rb") as f:
+                        body = f.read()
+                except OSError as e:
+                    print(f"Error serving {self.path}: {e}")
+                    self.send_text(500, f"Error reading {path}: {e}", send_body)
+                    return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+        def send_text(self, status, message, send_body):
+            body = (message + "\n").encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            print(f"{self.address_string()} - {format % args}")
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def serve(site, host=DEFAULT_HOST, port=DEFAULT_PORT, max_pages=DEFAULT_MAX_PAGES):
+    server = create_server(DevServer(site, max_pages), host, port)
+    print(f"Serving {site.content_dir} and {site.static_dir} on http://{host}:{server.server_port}{site.basepath}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Dev server stopped")
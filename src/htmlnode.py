@@ -1,4 +1,6 @@
 class HTMLNode():
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -6,7 +8,12 @@ class HTMLNode():
         self.props = props
 
     def to_html(self):
-        raise NotImplementedError("to_html method not implemented")
+        parts = []
+        self.write_html(parts.append)
+        return "".join(parts)
+
+    def write_html(self, write):
+        raise NotImplementedError("write_html method not implemented")
     
     def props_to_html(self):
         if self.props is None:
@@ -20,6 +27,8 @@ class HTMLNode():
         return f"HTMLNode({self.tag}, {self.value}, children: {self.children}, {self.props})"
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag=tag, value=value, children=None, props=props)
 
@@ -30,17 +39,29 @@ class LeafNode(HTMLNode):
           return self.value
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def write_html(self, write):
+        write(self.to_html())
+
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag=tag, children=children, props=props)
     
-    def to_html(self):
+    def write_html(self, write):
         if self.tag is None:
             raise ValueError("invalid HTML: no tag")
         if self.children is None:
             raise ValueError("invalid HTML: no children")
-        children_html = "".join([child.to_html() for child in self.children])
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
\ No newline at end of file
+        write(f"<{self.tag}{self.props_to_html()}>")
+        self.write_children_html(write)
+        write(f"</{self.tag}>")
+
+    def write_children_html(self, write):
+        if self.children is None:
+            raise ValueError("invalid HTML: no children")
+        for child in self.children:
+            child.write_html(write)
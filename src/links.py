@@ -0,0 +1,114 @@
+import hashlib
+import json
+import re
+from urllib.parse import unquote
+
+URL_ATTRIBUTE_PATTERN = re.compile(r'\b(href|src)="([^"]*)"')
+
+
+def is_internal(url):
+    return url.startswith("/") and not url.startswith("//")
+
+
+def split_url(url):
+    end = len(url)
+    for char in "?#":
+        index = url.find(char, 0, end)
+        if index != -1:
+            end = index
+    return url[:end], url[end:]
+
+
+# Link targets are kept in the build manifest as one "line url" string per
+# page; a list of pairs per page makes the indented JSON many times larger.
+def encode_targets(targets):
+    return "\n".join(f"{line} {url.replace(chr(10), ' ')}" for line, url in targets)
+
+
+# Targets only carry the first line of their block; the exact line is looked
+# up in the source for the few that turn out to be broken.
+def locate_target(path, line, url):
+    needle = "](" + url
+    try:
+        with open(path, "r") as f:
+            for number, text in enumerate(f, start=1):
+                if number >= line and needle in text:
+                    return number
+    except OSError:
+        pass
+    return line
+
+
+def decode_targets(encoded):
+    targets = []
+    for entry in encoded.split("\n") if encoded else ():
+        line, _, url = entry.partition(" ")
+        targets.append((int(line), url))
+    return targets
+
+
+# Resolves site-absolute URLs ("/blog/", "/index.css") to what is written to
+# the page: basepath prefix plus any fingerprinted asset name. `paths` is the
+# set of URLs the site serves; with it the table is precomputed once per
+# build and doubles as the list of valid internal link targets. `images`
+# maps image URLs to [width, height]; when given, image nodes also get their
+# dimensions and lazy loading through image_props().
+class LinkResolver():
+    def __init__(self, basepath="/", paths=None, assets=None, images=None):
+        self.basepath = basepath or "/"
+        self.prefix = self.basepath.rstrip("/")
+        self.assets = assets
+        self.images = images
+        self.complete = paths is not None
+        self.routes = {}
+        for path in paths or ():
+            self.routes[path] = self._target(path)
+        if assets is not None:
+            for path in assets.urls:
+                self.routes[path] = self._target(path)
+        key = self.basepath + "\0" + (assets.signature if assets is not None else "")
+        if images is not None:
+            key += "\0" + json.dumps(images, sort_keys=True)
+        self.signature = hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _target(self, path):
+        if self.assets is not None:
+            path = self.assets.url(path)
+        return self.prefix + path
+
+    def resolve(self, url):
+        if not is_internal(url):
+            return url
+        path, suffix = split_url(url)
+        target = self.routes.get(path)
+        if target is None:
+            target = self._target(path)
+        return target + suffix
+
+    def is_known(self, url):
+        if not self.complete or url in self.routes or not is_internal(url):
+            return True
+        path = split_url(url)[0]
+        if "%" in path:
+            path = unquote(path)
+        return path in self.routes or (not path.endswith("/") and path + "/" in self.routes)
+
+    def image_props(self, url):
+        size = self.images.get(split_url(url)[0]) if is_internal(url) else None
+        if size is None:
+            return {}
+        return {"width": str(size[0]), "height": str(size[1])}
+
+    def lazy_image_props(self, url):
+        props = self.image_props(url)
+        props["loading"] = "lazy"
+        return props
+
+    def rewrite_html(self, html):
+        return URL_ATTRIBUTE_PATTERN.sub(lambda match: f'{match.group(1)}="{self.resolve(match.group(2))}"', html)
+
+    def __len__(self):
+        return len(self.routes)
+
+    def __repr__(self):
+        return f"LinkResolver({self.basepath}, {len(self.routes)} routes)"
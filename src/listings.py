@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import re
+
+from htmlnode import LeafNode, ParentNode
+
+DEFAULT_PAGE_SIZE = 10
+LISTING_VERSION = "1"
+SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
+
+
+def slugify(value):
+    return SLUG_PATTERN.sub("-", str(value).lower()).strip("-") or "untitled"
+
+
+def url_for(dest_path, dest_dir):
+    relative = os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+    if relative == "index.html":
+        return "/"
+    if relative.endswith("/index.html"):
+        return "/" + relative[:-len("index.html")]
+    return "/" + relative
+
+
+def post_sort_key(post):
+    return (str(post.get("date", "")), post.get("title", ""))
+
+
+def sort_posts(posts):
+    dated = sorted((post for post in posts if post.get("date")), key=post_sort_key, reverse=True)
+    undated = sorted((post for post in posts if not post.get("date")), key=lambda post: (post.get("title", ""), post["url"]))
+    return dated + undated
+
+
+def post_tags(post):
+    tags = post.get("tags", [])
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(",")]
+    return [tag for tag in tags if tag]
+
+
+class ListingPage():
+    def __init__(self, dest, title, posts, page, pages, newer_url=None, older_url=None, tag_urls=None):
+        self.dest = dest
+        self.title = title
+        self.posts = posts
+        self.page = page
+        self.pages = pages
+        self.newer_url = newer_url
+        self.older_url = older_url
+        self.tag_urls = tag_urls if tag_urls is not None else {}
+
+    def entries(self):
+        return [
+            {"title": post.get("title", post["url"]), "url": post["url"], "date": post.get("date"), "tags": post_tags(post)}
+            for post in self.posts
+        ]
+
+    def signature(self, *extra):
+        data = [LISTING_VERSION, self.title, self.page, self.pages, self.newer_url, self.older_url, self.entries(), extra]
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def to_html_node(self, resolve=None):
+        from html import escape
+        if resolve is None:
+            resolve = str
+        items = []
+        for entry in self.entries():
+            children = [LeafNode("a", escape(entry["title"], quote=False), {"href": resolve(entry["url"])})]
+            if entry["date"]:
+                children.append(LeafNode(None, " "))
+                children.append(LeafNode("time", escape(str(entry["date"])), {"datetime": escape(str(entry["date"]))}))
+            if entry["tags"]:
+                children.append(LeafNode(None, " "))
+                links = [
+                    LeafNode("a", escape(tag, quote=False), {"href": resolve(self.tag_urls[tag]), "rel": "tag"})
+                    for tag in entry["tags"] if tag in self.tag_urls
+                ]
+                children.append(ParentNode("span", links, {"class": "tags"}))
+            items.append(ParentNode("li", children))
+        children = [LeafNode("h1", escape(self.title, quote=False))]
+        children.append(ParentNode("ul", items, {"class": "post-list"}) if items else LeafNode("p", "No posts yet."))
+        links = []
+        if self.newer_url is not None:
+            links.append(LeafNode("a", "Newer posts", {"href": resolve(self.newer_url), "rel": "prev"}))
+        if self.older_url is not None:
+            links.append(LeafNode("a", "Older posts", {"href": resolve(self.older_url), "rel": "next"}))
+        if links:
+            children.append(ParentNode("nav", links, {"class": "pagination"}))
+        return ParentNode("div", children)
+
+    def __repr__(self):
+        return f"ListingPage({self.dest}, {self.title}, page {self.page}/{self.pages}, posts: {len(self.posts)})"
+
+
+def paginate(posts, dest_root, dest_dir, title, page_size, tag_urls):
+    chunks = [posts[i:i + page_size] for i in range(0, len(posts), page_size)] or [[]]
+    dests = [os.path.join(dest_root, "index.html")]
+    dests.extend(os.path.join(dest_root, "page", str(number), "index.html") for number in range(2, len(chunks) + 1))
+    urls = [url_for(dest, dest_dir) for dest in dests]
+    pages = []
+    for number, chunk in enumerate(chunks, start=1):
+        page_title = title if number == 1 else f"{title} (page {number})"
+        newer_url = urls[number - 2] if number > 1 else None
+        older_url = urls[number] if number < len(chunks) else None
+        pages.append(ListingPage(dests[number - 1], page_title, chunk, number, len(chunks), newer_url, older_url, tag_urls))
+    return pages
+
+
+def build_listings(posts, dest_dir, listing_dir, title="Blog", page_size=DEFAULT_PAGE_SIZE):
+    dest_root = os.path.join(dest_dir, listing_dir)
+    posts = sort_posts(posts)
+    tagged = {}
+    names = {}
+    tag_urls = {}
+    for post in posts:
+        for tag in post_tags(post):
+            slug = slugify(tag)
+            names.setdefault(slug, tag)
+            tag_posts = tagged.setdefault(slug, [])
+            if not tag_posts or tag_posts[-1] is not post:
+                tag_posts.append(post)
+            tag_urls[tag] = url_for(os.path.join(dest_root, "tags", slug, "index.html"), dest_dir)
+    pages = paginate(posts, dest_root, dest_dir, title, page_size, tag_urls)
+    for slug in sorted(tagged):
+        tag_root = os.path.join(dest_root, "tags", slug)
+        pages.extend(paginate(tagged[slug], tag_root, dest_dir, f"Posts tagged {names[slug]}", page_size, tag_urls))
+    return pages
@@ -1,68 +1,107 @@
-import shutil
 import os
 import sys
-from blocks import markdown_to_html_node
+from builder import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_MAX_BYTES,
+    BuildError,
+    Site,
+    clean_docs,
+    collect_pages,
+    extract_title,
+    generate_page,
+    generate_pages,
+    generate_pages_recursive,
+    remove_stale_pages,
+    render_page,
+)
 
-def clean_docs():
-    shutil.rmtree("docs", ignore_errors=True)
+def parse_args(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the site from content/ into docs/.")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix for absolute links (default: /)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="render pages in N worker processes (0 = one per CPU)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"block render cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), help="block render cache size limit in MB (default: 256)")
+    parser.add_argument("--no-cache", action="store_true", help="render every block without the block cache")
+    parser.add_argument("--hardlink-static", action="store_true", help="hardlink static files into docs/ instead of copying")
+    parser.add_argument("--shard", metavar="K/N", help="build only the K-th of N partitions of the pages (placed by path hash, balanced by size)")
+    parser.add_argument("--merge-shards", type=int, metavar="N", help="combine and verify the manifests of N shard builds")
+    parser.add_argument("--delta-file", default="./.deploy-delta.json", help="where to write the added/changed/removed output list (default: ./.deploy-delta.json)")
+    parser.add_argument("--fingerprint", action="store_true", help="also copy static assets as name.<hash>.ext and rewrite rendered references to them")
+    parser.add_argument("--optimize", action="store_true", help="inline small stylesheets and give images width, height and lazy loading")
+    parser.add_argument("--inline-css-limit", type=int, default=8192, metavar="BYTES", help="largest stylesheet --optimize inlines (default: 8192)")
+    parser.add_argument("--gzip", action="store_true", help="write .gz siblings for generated HTML and text assets")
+    parser.add_argument("--gzip-level", type=int, default=9, choices=range(1, 10), metavar="1-9", help="compression level for --gzip (default: 9)")
+    parser.add_argument("--listing-dir", default="blog", help="content subdirectory to generate index, tag and archive pages for, empty to disable (default: blog)")
+    parser.add_argument("--page-size", type=int, default=10, help="posts per generated listing page (default: 10)")
+    parser.add_argument("--search", action="store_true", help="write a prefix-sharded search index to docs/search/")
+    parser.add_argument("--check-links", action="store_true", help="report internal links and images that point at no page or static file")
+    parser.add_argument("--watch", action="store_true", help="keep running and rebuild whatever changes")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="seconds between change checks in --watch mode (default: 0.5)")
+    parser.add_argument("--daemon", action="store_true", help="keep caches warm and serve build commands on a Unix socket")
+    parser.add_argument("--socket", default="./.build.sock", help="socket path for --daemon (default: ./.build.sock)")
+    parser.add_argument("--serve", action="store_true", help="serve pages rendered on request from memory instead of building docs/")
+    parser.add_argument("--host", default="127.0.0.1", help="address for --serve to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8888, help="port for --serve to listen on (default: 8888)")
+    parser.add_argument("--profile", action="store_true", help="print a per-stage timing breakdown after the build")
+    parser.add_argument("--profile-top", type=int, default=10, help="number of slowest pages to list with --profile (default: 10)")
+    parser.add_argument("--trace", metavar="FILE", help="write a Chrome trace-event JSON file (implies --profile)")
+    args = parser.parse_args(argv)
+    if args.shard:
+        from shard import parse_shard
+        try:
+            args.shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
 
-def copy_files_recursive(src, dst):
-    if not os.path.exists(dst):
-        os.makedirs(dst)
-    for filename in os.listdir(src):
-        src_path = os.path.join(src, filename)
-        dst_path = os.path.join(dst, filename)
-        print(f"Copying {src_path} to {dst_path}")
-        if os.path.isfile(src_path):
-            shutil.copy2(src_path, dst_path)
-        elif os.path.isdir(src_path):
-            copy_files_recursive(src_path, dst_path)
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    profiler = None
+    if args.profile or args.trace:
+        from profiler import Profiler
+        profiler = Profiler(record_events=bool(args.trace))
+    site = Site(
+        basepath=args.basepath,
+        delta_path=args.delta_file,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        cache_size=args.cache_size * 1024 * 1024,
+        jobs=args.jobs if args.jobs > 0 else os.cpu_count() or 1,
+        hardlink_static=args.hardlink_static,
+        profiler=profiler,
+        shard=args.shard,
+        gzip_level=args.gzip_level if args.gzip else None,
+        listing_dir=args.listing_dir,
+        page_size=args.page_size,
+        search=args.search,
+        fingerprint=args.fingerprint,
+        check_links=args.check_links,
+        optimize=args.optimize,
+        inline_css_limit=args.inline_css_limit,
+    )
+    if args.merge_shards:
+        site.merge_shards(args.merge_shards)
+        if site.broken_links:
+            sys.exit(1)
+        return
+    if args.daemon:
+        from daemon import serve
+        serve(site, args.socket)
+        return
+    if args.serve:
+        from devserver import serve
+        serve(site, args.host, args.port)
+        return
+    site.build()
+    if profiler is not None:
+        print(profiler.report(args.profile_top))
+        if args.trace:
+            profiler.write_trace(args.trace)
+            print(f"Wrote trace events to {args.trace}")
+    if args.watch:
+        site.watch(args.poll_interval)
+    elif site.broken_links:
+        sys.exit(1)
 
-def extract_title(markdown):
-    for line in markdown.splitlines():
-        if line.lstrip().startswith("# "):
-            return line.lstrip()[2:].strip()
-    raise Exception("Title not found in markdown")
-
-def generate_page(from_path, template_path, dest_path, basepath=None):
-    print(f"Generating page from {from_path} to {dest_path} using template {template_path}")
-    with open(from_path, "r") as file:
-        markdown = file.read()
-    with open(template_path, "r") as template:
-        template_content = template.read()
-    html = markdown_to_html_node(markdown).to_html()
-    if html.startswith("<div>") and html.endswith("</div>"):
-        html = html[len("<div>") : -len("</div>")]
-    title = extract_title(markdown)
-    page_content = template_content.replace("{{ Content }}", html).replace("{{ Title }}", title)
-    if basepath:
-        page_content = page_content.replace('href="/', f'href="{basepath}')
-        page_content = page_content.replace('src="/', f'src="{basepath}')
-    final_dest_path = os.path.dirname(dest_path)
-    if final_dest_path:
-        if not os.path.exists(final_dest_path):
-            os.makedirs(final_dest_path)
-    with open(dest_path, "w") as f:
-        f.write(page_content)
-
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath=None):
-    for file in os.listdir(dir_path_content):
-        entry = os.path.join(dir_path_content, file) #makes it a full path
-        if os.path.isdir(entry):
-            generate_pages_recursive(entry, template_path, os.path.join(dest_dir_path, file), basepath)
-        if os.path.isfile(entry) and entry.endswith(".md"):
-            generate_page(entry, template_path, os.path.join(dest_dir_path, file[:-3] + ".html"), basepath)
-
-
-    
-
-def main():
-    clean_docs()
-    copy_files_recursive("./static", "./docs")
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
-    generate_pages_recursive("./content", "./template.html", "./docs", basepath)
-
-    
-    pass
-
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest():
+    def __init__(self, template_hash=None, basepath=None, pages=None, static=None, shard=None, listings=None, search=None, assets=None, uncompressed=None):
+        self.template_hash = template_hash
+        self.basepath = basepath
+        self.pages = pages if pages is not None else {}
+        self.static = static if static is not None else []
+        self.shard = shard
+        self.listings = listings if listings is not None else {}
+        self.search = search if search is not None else []
+        self.assets = assets if assets is not None else {}
+        self.uncompressed = uncompressed if uncompressed is not None else {}
+
+    def record(self, source, source_hash, dest):
+        self.pages[source] = {"hash": source_hash, "dest": dest}
+
+    def unchanged_since(self, previous, source, source_hash, dest):
+        if previous is None:
+            return False
+        if previous.template_hash != self.template_hash or previous.basepath != self.basepath:
+            return False
+        if previous.assets != self.assets:
+            return False
+        entry = previous.pages.get(source)
+        if entry is None:
+            return False
+        return entry["hash"] == source_hash and entry["dest"] == dest and os.path.exists(dest)
+
+    def stale_outputs(self, previous):
+        if previous is None:
+            return []
+        current = {entry["dest"] for entry in self.pages.values()}
+        stale = []
+        for source in sorted(previous.pages):
+            dest = previous.pages[source]["dest"]
+            if source not in self.pages and dest not in current:
+                stale.append(dest)
+        return stale
+
+    def to_dict(self):
+        data = {
+            "template": self.template_hash,
+            "basepath": self.basepath,
+            "pages": self.pages,
+            "static": self.static,
+            "listings": self.listings,
+            "search": self.search,
+            "assets": self.assets,
+            "uncompressed": self.uncompressed,
+        }
+        if self.shard is not None:
+            data["shard"] = self.shard
+        return data
+
+    def __repr__(self):
+        return f"BuildManifest({self.template_hash}, {self.basepath}, pages: {len(self.pages)})"
+
+
+def load_manifest(path):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    return BuildManifest(
+        data.get("template"), data.get("basepath"), data.get("pages", {}), data.get("static", []), data.get("shard"),
+        data.get("listings", {}), data.get("search", []), data.get("assets", {}),
+        data.get("uncompressed", {}),
+    )
+
+
+def write_json_atomic(path, data):
+    import tempfile
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_manifest(manifest, path):
+    write_json_atomic(path, manifest.to_dict())
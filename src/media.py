@@ -0,0 +1,175 @@
+import json
+import os
+import re
+import struct
+
+from links import is_internal, split_url
+from manifest import hash_file, write_json_atomic
+
+MEDIA_VERSION = "2"
+INLINE_CSS_LIMIT = 8 * 1024
+IMAGE_EXTENSIONS = {".png", ".gif", ".jpg", ".jpeg"}
+LINK_TAG_PATTERN = re.compile(r"<link\b[^>]*>")
+ATTRIBUTE_PATTERN = re.compile(r'\b([\w-]+)="([^"]*)"')
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Start-of-frame markers; C4, C8 and CC share the range but are not frames.
+JPEG_FRAME_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _png_size(f, header):
+    if len(header) < 24 or header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+def _gif_size(f, header):
+    if len(header) < 10:
+        return None
+    return struct.unpack("<HH", header[6:10])
+
+
+def _jpeg_size(f, header):
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        while len(marker) == 2 and marker[0] == 0xFF and marker[1] == 0xFF:
+            marker = marker[1:] + f.read(1)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if 0xD0 <= marker[1] <= 0xD9 or marker[1] == 0x01:
+            continue
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        length = struct.unpack(">H", length)[0]
+        if marker[1] in JPEG_FRAME_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+# Reads only as much of the file as the format needs to find its size.
+def image_size(path):
+    with open(path, "rb") as f:
+        header = f.read(24)
+        if header.startswith(PNG_SIGNATURE):
+            size = _png_size(f, header)
+        elif header[:6] in (b"GIF87a", b"GIF89a"):
+            size = _gif_size(f, header)
+        elif header[:2] == b"\xff\xd8":
+            size = _jpeg_size(f, header)
+        else:
+            size = None
+    if size is None or not all(size):
+        return None
+    return list(size)
+
+
+# Sizes are stored by content hash; `files` remembers the (size, mtime)
+# each path had when it was last hashed, so an unchanged image costs a stat
+# instead of a full read, as in sync.is_unchanged.
+class ImageSizeCache():
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.files = {}
+        self.hits = 0
+        self.misses = 0
+        self.hashed = 0
+        self.dirty = False
+        self.used = set()
+        self.seen = set()
+        if path is not None:
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = None
+            if isinstance(data, dict) and data.get("version") == MEDIA_VERSION:
+                self.entries = data.get("entries", {})
+                self.files = data.get("files", {})
+
+    def source_hash(self, path):
+        stat = os.stat(path)
+        self.seen.add(path)
+        known = self.files.get(path)
+        if known is not None and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        self.hashed += 1
+        source_hash = hash_file(path)
+        self.files[path] = [stat.st_size, stat.st_mtime_ns, source_hash]
+        self.dirty = True
+        return source_hash
+
+    def get(self, path, source_hash=None):
+        if source_hash is None:
+            source_hash = self.source_hash(path)
+        self.used.add(source_hash)
+        if source_hash in self.entries:
+            self.hits += 1
+            return self.entries[source_hash]
+        self.misses += 1
+        try:
+            size = image_size(path)
+        except (OSError, struct.error):
+            size = None
+        self.entries[source_hash] = size
+        self.dirty = True
+        return size
+
+    def save(self, prune=False):
+        if prune and len(self.used) < len(self.entries):
+            self.entries = {key: value for key, value in self.entries.items() if key in self.used}
+            self.dirty = True
+        if prune and len(self.seen) < len(self.files):
+            self.files = {key: value for key, value in self.files.items() if key in self.seen}
+            self.dirty = True
+        if self.path is None or not self.dirty:
+            return
+        write_json_atomic(self.path, {"version": MEDIA_VERSION, "entries": self.entries, "files": self.files})
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def image_sizes(static_dir, files, cache):
+    sizes = {}
+    for rel_path in files:
+        if os.path.splitext(rel_path)[1].lower() not in IMAGE_EXTENSIONS:
+            continue
+        size = cache.get(os.path.join(static_dir, rel_path))
+        if size is not None:
+            sizes["/" + rel_path.replace(os.sep, "/")] = size
+    return sizes
+
+
+def stylesheet_path(tag, static_dir):
+    attributes = dict(ATTRIBUTE_PATTERN.findall(tag))
+    href = attributes.get("href", "")
+    if attributes.get("rel") != "stylesheet" or attributes.get("media", "all") not in ("all", "screen") or not is_internal(href):
+        return None
+    root = os.path.abspath(static_dir)
+    path = os.path.abspath(os.path.join(root, *split_url(href)[0].split("/")))
+    if not path.startswith(root + os.sep) or not os.path.isfile(path):
+        return None
+    return path
+
+
+# Swaps <link rel="stylesheet"> tags for small local stylesheets with an
+# inline <style> block. Stylesheets with url() or @import are left alone,
+# since their relative references would resolve against the page instead.
+def inline_stylesheets(html, static_dir, limit=INLINE_CSS_LIMIT):
+    def replace(match):
+        path = stylesheet_path(match.group(0), static_dir)
+        if path is None or os.path.getsize(path) > limit:
+            return match.group(0)
+        with open(path, "r") as f:
+            css = f.read().strip()
+        if "url(" in css or "@import" in css or "</style" in css.lower():
+            return match.group(0)
+        return f"<style>{css}</style>"
+    return LINK_TAG_PATTERN.sub(replace, html)
@@ -0,0 +1,125 @@
+import json
+
+from manifest import hash_file, write_json_atomic
+
+METADATA_VERSION = "1"
+FRONT_MATTER_DELIMITER = "---"
+
+
+def parse_value(value):
+    value = value.strip()
+    if value.startswith("[") and value.endswith("]"):
+        return [parse_value(item) for item in value[1:-1].split(",") if item.strip()]
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def parse_front_matter(lines):
+    metadata = {}
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        key, sep, value = line.partition(":")
+        if not sep:
+            raise ValueError(f"invalid front matter line: {line.strip()!r}")
+        metadata[key.strip().lower()] = parse_value(value)
+    return metadata
+
+
+def find_title(lines):
+    for line in lines:
+        stripped = line.lstrip()
+        if stripped.startswith("# "):
+            return stripped[2:].strip()
+    return None
+
+
+def read_header(lines):
+    metadata = {}
+    first = next(lines, None)
+    if first is not None and first.rstrip() == FRONT_MATTER_DELIMITER:
+        header = []
+        for line in lines:
+            if line.rstrip() == FRONT_MATTER_DELIMITER:
+                metadata = parse_front_matter(header)
+                first = None
+                break
+            header.append(line)
+        else:
+            lines = iter(header)
+    if "title" not in metadata:
+        title = find_title([first] if first is not None else ())
+        if title is None:
+            title = find_title(lines)
+        if title is not None:
+            metadata["title"] = title
+    return metadata
+
+
+def split_front_matter(markdown):
+    if not markdown.startswith(FRONT_MATTER_DELIMITER):
+        return {}, markdown
+    first_end = markdown.find("\n")
+    if first_end == -1 or markdown[:first_end].rstrip() != FRONT_MATTER_DELIMITER:
+        return {}, markdown
+    position = first_end + 1
+    while True:
+        end = markdown.find("\n", position)
+        line = markdown[position:] if end == -1 else markdown[position:end]
+        if line.rstrip() == FRONT_MATTER_DELIMITER:
+            header = markdown[first_end + 1:position].splitlines()
+            body = "" if end == -1 else markdown[end + 1:]
+            return parse_front_matter(header), body
+        if end == -1:
+            return {}, markdown
+        position = end + 1
+
+
+def read_metadata(path):
+    with open(path, "r") as f:
+        return read_header(iter(f))
+
+
+class MetadataCache():
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self.used = set()
+        if path is not None:
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = None
+            if isinstance(data, dict) and data.get("version") == METADATA_VERSION:
+                self.entries = data.get("entries", {})
+
+    def get(self, path, source_hash=None):
+        if source_hash is None:
+            source_hash = hash_file(path)
+        self.used.add(source_hash)
+        metadata = self.entries.get(source_hash)
+        if metadata is not None:
+            self.hits += 1
+            return dict(metadata)
+        self.misses += 1
+        metadata = read_metadata(path)
+        self.entries[source_hash] = metadata
+        self.dirty = True
+        return dict(metadata)
+
+    def save(self, prune=False):
+        if prune and len(self.used) < len(self.entries):
+            self.entries = {key: value for key, value in self.entries.items() if key in self.used}
+            self.dirty = True
+        if self.path is None or not self.dirty:
+            return
+        write_json_atomic(self.path, {"version": METADATA_VERSION, "entries": self.entries})
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import stat
+import tempfile
+
+from manifest import hash_file, write_json_atomic
+
+DELTA_PATH = "./.deploy-delta.json"
+WRITE_BUFFER_SIZE = 64 * 1024
+
+ADDED = "added"
+CHANGED = "changed"
+
+
+def _umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# mkstemp creates files as 0600; outputs get the mode the file they replace
+# had, or what a plain open() would have given them under the umask.
+DEFAULT_MODE = 0o666 & ~_umask()
+
+
+def output_mode(path):
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return DEFAULT_MODE
+
+
+def write_bytes_atomic(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            os.fchmod(f.fileno(), output_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_if_changed(path, data):
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        write_bytes_atomic(path, data)
+        return ADDED
+    if size == len(data) and hash_file(path) == hashlib.sha256(data).hexdigest():
+        return None
+    write_bytes_atomic(path, data)
+    return CHANGED
+
+
+# Streams a page into a temp file next to `path`, hashing it on the way, so
+# the page is never held as one string. Text is encoded and written in
+# chunks of about WRITE_BUFFER_SIZE characters; commit() then either moves the temp
+# file into place or drops it when the existing file has the same bytes.
+# `sink` is the raw file write and may be wrapped (e.g. by a TimedWriter).
+class HashingWriter():
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=".tmp-")
+        self.file = os.fdopen(fd, "wb")
+        self.sink = self.file.write
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.parts = []
+        self.pending = 0
+
+    def __call__(self, chunk):
+        self.parts.append(chunk)
+        self.pending += len(chunk)
+        if self.pending >= WRITE_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.parts:
+            return
+        data = "".join(self.parts).encode("utf-8")
+        self.parts.clear()
+        self.pending = 0
+        self.digest.update(data)
+        self.size += len(data)
+        self.sink(data)
+
+    def commit(self):
+        self.flush()
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = None
+        if size == self.size and hash_file(self.path) == self.digest.hexdigest():
+            self.file.close()
+            os.remove(self.tmp_path)
+            return None
+        os.fchmod(self.file.fileno(), output_mode(self.path))
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+        return ADDED if size is None else CHANGED
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class OutputDelta():
+    def __init__(self, root, added=None, changed=None, removed=None):
+        self.root = root
+        self.added = added if added is not None else []
+        self.changed = changed if changed is not None else []
+        self.removed = removed if removed is not None else []
+
+    def relative(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def record(self, path, status):
+        if status == ADDED:
+            self.added.append(self.relative(path))
+        elif status == CHANGED:
+            self.changed.append(self.relative(path))
+
+    def remove(self, path):
+        self.removed.append(self.relative(path))
+
+    def to_dict(self):
+        return {
+            "added": sorted(set(self.added)),
+            "changed": sorted(set(self.changed)),
+            "removed": sorted(set(self.removed)),
+        }
+
+    def save(self, path=DELTA_PATH):
+        write_json_atomic(path, self.to_dict())
+
+    def __len__(self):
+        return len(self.added) + len(self.changed) + len(self.removed)
+
+    def __repr__(self):
+        return f"OutputDelta({len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed)"
+
+
+def load_delta(path, root):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return OutputDelta(root, data.get("added", []), data.get("changed", []), data.get("removed", []))
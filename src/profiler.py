@@ -0,0 +1,152 @@
+import os
+import time
+
+
+class _NullStage():
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class NullProfiler():
+    enabled = False
+
+    def stage(self, name, **args):
+        return _NULL_STAGE
+
+    def page(self, path):
+        return _NULL_STAGE
+
+    def count(self, name, amount=1):
+        pass
+
+    def add(self, name, elapsed):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class _Stage():
+    __slots__ = ("profiler", "name", "args", "start")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler._add_stage(self.name, self.start, time.perf_counter() - self.start, self.args)
+        return False
+
+
+class _Page(_Stage):
+    __slots__ = ()
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        self.profiler.pages.append((elapsed, self.name))
+        self.profiler._add_event("page", self.start, elapsed, {"path": self.name})
+        return False
+
+
+class TimedWriter():
+    __slots__ = ("write", "elapsed")
+
+    def __init__(self, write):
+        self.write = write
+        self.elapsed = 0.0
+
+    def __call__(self, chunk):
+        start = time.perf_counter()
+        self.write(chunk)
+        self.elapsed += time.perf_counter() - start
+
+
+class Profiler():
+    enabled = True
+
+    def __init__(self, record_events=False):
+        self.record_events = record_events
+        self.stages = {}
+        self.counters = {}
+        self.pages = []
+        self.events = []
+
+    def stage(self, name, **args):
+        return _Stage(self, name, args)
+
+    def page(self, path):
+        return _Page(self, path, None)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add(self, name, elapsed):
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def _add_stage(self, name, start, elapsed, args):
+        self.add(name, elapsed)
+        self._add_event(name, start, elapsed, args)
+
+    def _add_event(self, name, start, elapsed, args):
+        if not self.record_events:
+            return
+        import threading
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": round(start * 1_000_000, 1),
+            "dur": round(elapsed * 1_000_000, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def to_data(self):
+        return {
+            "stages": self.stages,
+            "counters": self.counters,
+            "pages": self.pages,
+            "events": self.events,
+        }
+
+    def merge(self, data):
+        for name, elapsed in data["stages"].items():
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+        for name, amount in data["counters"].items():
+            self.count(name, amount)
+        self.pages.extend(tuple(page) for page in data["pages"])
+        self.events.extend(data["events"])
+
+    def report(self, top=10):
+        total = sum(self.stages.values())
+        lines = [f"Build profile: {total * 1000:.1f}ms across {len(self.stages)} stages"]
+        for name, elapsed in sorted(self.stages.items(), key=lambda item: item[1], reverse=True):
+            share = elapsed / total * 100 if total else 0.0
+            lines.append(f"  {name:<16} {elapsed * 1000:>10.2f}ms {share:>6.1f}%")
+        if self.counters:
+            lines.append("Counters:")
+            for name in sorted(self.counters):
+                lines.append(f"  {name:<16} {self.counters[name]:>10}")
+        if self.pages and top:
+            lines.append(f"Slowest {min(top, len(self.pages))} pages:")
+            for elapsed, path in sorted(self.pages, reverse=True)[:top]:
+                lines.append(f"  {elapsed * 1000:>10.2f}ms {path}")
+        return "\n".join(lines)
+
+    def write_trace(self, path):
+        import json
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
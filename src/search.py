@@ -0,0 +1,226 @@
+import functools
+import json
+import os
+import re
+
+from output import write_if_changed
+
+SEARCH_VERSION = "1"
+SEARCH_DIR = "search"
+PREFIX_LENGTH = 2
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 32
+TERM_PATTERN = re.compile(r"\w+")
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def page_terms(text):
+    if not isinstance(text, str):
+        text = " ".join(text)
+    return sorted(
+        term for term in set(TERM_PATTERN.findall(text.lower()))
+        if MIN_TERM_LENGTH <= len(term) <= MAX_TERM_LENGTH and not term.isdigit()
+    )
+
+
+def shard_name(term):
+    return _prefix_shard_name(term[:PREFIX_LENGTH])
+
+
+@functools.lru_cache(maxsize=None)
+def _prefix_shard_name(prefix):
+    if prefix.isascii() and prefix.isalnum():
+        return prefix
+    return "_" + prefix.encode("utf-8").hex()
+
+
+def to_base36(number):
+    if number == 0:
+        return "0"
+    digits = []
+    while number:
+        number, remainder = divmod(number, 36)
+        digits.append(DIGITS[remainder])
+    return "".join(reversed(digits))
+
+
+SMALL_BASE36 = [to_base36(number) for number in range(36 * 36)]
+
+
+# Postings are sorted page IDs stored as base-36 gaps: [3, 5, 40] -> "3,2,z".
+def encode_ids(ids):
+    previous = 0
+    gaps = []
+    for page_id in sorted(ids):
+        gap = page_id - previous
+        gaps.append(SMALL_BASE36[gap] if gap < 1296 else to_base36(gap))
+        previous = page_id
+    return ",".join(gaps)
+
+
+def decode_ids(encoded):
+    ids = []
+    total = 0
+    for gap in encoded.split(",") if encoded else ():
+        total += int(gap, 36)
+        ids.append(total)
+    return ids
+
+
+class SearchIndex():
+    def __init__(self, pages=None):
+        self.pages = {}
+        self.urls = []
+        self.free_ids = []
+        self.postings = {}
+        self.shards = {}
+        self.dirty = set()
+        self.pages_dirty = True
+        self.changed = False
+        for source, page in (pages or {}).items():
+            self._add(source, page)
+        self.free_ids = sorted(set(range(len(self.urls))) - {page["id"] for page in self.pages.values()}, reverse=True)
+        self.dirty = set(self.shards)
+
+    def _add(self, source, page):
+        page_id = page["id"]
+        self.pages[source] = page
+        while len(self.urls) <= page_id:
+            self.urls.append(None)
+        self.urls[page_id] = [page["url"], page["title"]]
+        postings = self.postings
+        shards = self.shards
+        prefix = name = None
+        for term in page["terms"]:
+            if term[:PREFIX_LENGTH] != prefix:
+                prefix = term[:PREFIX_LENGTH]
+                name = _prefix_shard_name(prefix)
+                self.dirty.add(name)
+            ids = postings.get(term)
+            if ids is None:
+                postings[term] = {page_id}
+                shards.setdefault(name, set()).add(term)
+            else:
+                ids.add(page_id)
+
+    def _discard_terms(self, page):
+        prefix = name = None
+        for term in page["terms"]:
+            ids = self.postings.get(term)
+            if ids is None:
+                continue
+            ids.discard(page["id"])
+            if term[:PREFIX_LENGTH] != prefix:
+                prefix = term[:PREFIX_LENGTH]
+                name = _prefix_shard_name(prefix)
+                self.dirty.add(name)
+            if not ids:
+                del self.postings[term]
+                self.shards[name].discard(term)
+
+    def terms_for(self, source, source_hash):
+        page = self.pages.get(source)
+        if page is None or page["hash"] != source_hash:
+            return None
+        return page["terms"]
+
+    def mark_all_dirty(self):
+        self.dirty = set(self.shards)
+        self.pages_dirty = True
+
+    def update(self, source, source_hash, url, title, terms):
+        old = self.pages.get(source)
+        if old is not None and old["hash"] == source_hash and old["terms"] == terms:
+            if (old["url"], old["title"]) != (url, title):
+                old["url"], old["title"] = url, title
+                self.urls[old["id"]] = [url, title]
+                self.pages_dirty = True
+                self.changed = True
+            return
+        if old is not None:
+            page_id = old["id"]
+            self._discard_terms(old)
+        elif self.free_ids:
+            page_id = self.free_ids.pop()
+        else:
+            page_id = len(self.urls)
+        self._add(source, {"id": page_id, "hash": source_hash, "url": url, "title": title, "terms": terms})
+        self.pages_dirty = True
+        self.changed = True
+
+    def remove(self, source):
+        page = self.pages.pop(source, None)
+        if page is None:
+            return
+        self._discard_terms(page)
+        self.urls[page["id"]] = None
+        self.free_ids.append(page["id"])
+        self.free_ids.sort(reverse=True)
+        self.pages_dirty = True
+        self.changed = True
+
+    def shard_data(self, name):
+        return {term: encode_ids(self.postings[term]) for term in sorted(self.shards.get(name, ()))}
+
+    def outputs(self, directory):
+        files = [os.path.join(directory, "pages.json")]
+        files.extend(os.path.join(directory, f"{name}.json") for name in sorted(self.shards) if self.shards[name])
+        return files
+
+    def write(self, directory, delta=None):
+        from sync import remove_file
+        written = 0
+        if self.pages_dirty:
+            data = {"version": SEARCH_VERSION, "prefix": PREFIX_LENGTH, "pages": self.urls}
+            status = write_if_changed(os.path.join(directory, "pages.json"), _compact_json(data))
+            if delta is not None:
+                delta.record(os.path.join(directory, "pages.json"), status)
+            written += status is not None
+        for name in sorted(self.dirty):
+            path = os.path.join(directory, f"{name}.json")
+            if self.shards.get(name):
+                status = write_if_changed(path, _compact_json(self.shard_data(name)))
+                if delta is not None:
+                    delta.record(path, status)
+                written += status is not None
+            else:
+                self.shards.pop(name, None)
+                if os.path.exists(path):
+                    remove_file(path, directory)
+                    if delta is not None:
+                        delta.remove(path)
+        self.dirty = set()
+        self.pages_dirty = False
+        return written
+
+    def to_dict(self):
+        return {"version": SEARCH_VERSION, "pages": self.pages}
+
+    def save(self, path):
+        from manifest import write_json_atomic
+        write_json_atomic(path, self.to_dict())
+        self.changed = False
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __repr__(self):
+        return f"SearchIndex({len(self.pages)} pages, {len(self.postings)} terms, {len(self.shards)} shards)"
+
+
+def _compact_json(data):
+    return json.dumps(data, separators=(",", ":"), sort_keys=True, ensure_ascii=False).encode("utf-8")
+
+
+def load_search_index(path):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != SEARCH_VERSION:
+        return None
+    index = SearchIndex(data.get("pages", {}))
+    index.pages_dirty = False
+    index.dirty = set()
+    return index
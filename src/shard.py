@@ -0,0 +1,112 @@
+import hashlib
+import os
+
+
+class ShardMergeError(Exception):
+    def __init__(self, problems):
+        self.problems = problems
+        lines = [f"{len(problems)} problem(s) merging shard manifests:"]
+        lines.extend(f"  {problem}" for problem in problems)
+        super().__init__("\n".join(lines))
+
+
+def parse_shard(value):
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"invalid shard {value!r}, expected K/N such as 1/4")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"invalid shard {value!r}, K must be between 1 and N")
+    return index, count
+
+
+def shard_path(path, index, count):
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard-{index}-of-{count}{ext}"
+
+
+BALANCE_SLACK = 0.25
+_MASK = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+def stable_hash(relative_path):
+    key = relative_path.replace(os.sep, "/").encode("utf-8")
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "big")
+
+
+def _mix(value):
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+
+def shard_ranking(page_hash, count):
+    return sorted(range(count), key=lambda index: _mix((page_hash + (index + 1) * _GOLDEN) & _MASK), reverse=True)
+
+
+# Rendezvous hashing with bounded loads: every page ranks the shards by a
+# hash of its content-relative path and goes to the first one whose share of
+# the total source size stays under (1 + BALANCE_SLACK) / count. Pages are
+# placed in path-hash order, so a page's shard depends on its path rather
+# than on the sizes of other pages; a page only moves when a size change
+# pushes one of its preferred shards over the bound.
+def assign_shards(pages, count, root):
+    entries = []
+    total = 0
+    for from_path, dest_path in pages:
+        relative = os.path.relpath(from_path, root)
+        size = os.path.getsize(from_path) + 1
+        total += size
+        entries.append((stable_hash(relative), relative, size, (from_path, dest_path)))
+    entries.sort()
+    capacity = total * (1 + BALANCE_SLACK) / count
+    loads = [0] * count
+    shards = [[] for _ in range(count)]
+    for page_hash, _, size, page in entries:
+        index = next((index for index in shard_ranking(page_hash, count) if loads[index] + size <= capacity), None)
+        if index is None:
+            index = min(range(count), key=lambda i: (loads[i], i))
+        loads[index] += size
+        shards[index].append(page)
+    return [sorted(shard) for shard in shards]
+
+
+def select_shard(pages, shard, root):
+    index, count = shard
+    if count == 1:
+        return list(pages)
+    return assign_shards(pages, count, root)[index - 1]
+
+
+def merge_manifests(partials, count, expected_sources):
+    from manifest import BuildManifest
+    problems = []
+    missing_shards = [index for index in range(1, count + 1) if partials.get(index) is None]
+    if missing_shards:
+        problems.append(f"missing shard manifest(s): {', '.join(map(str, missing_shards))}")
+        raise ShardMergeError(problems)
+    first = partials[1]
+    merged = BuildManifest(first.template_hash, first.basepath, static=first.static, listings=first.listings, assets=first.assets)
+    owners = {}
+    for index in range(1, count + 1):
+        partial = partials[index]
+        if partial.shard != [index, count]:
+            problems.append(f"shard {index}/{count} manifest was written for shard {partial.shard}")
+        if (partial.template_hash, partial.basepath) != (first.template_hash, first.basepath):
+            problems.append(f"shard {index}/{count} was built with a different template or basepath")
+        if partial.assets != first.assets:
+            problems.append(f"shard {index}/{count} was built with different static asset fingerprints")
+        for source, entry in partial.pages.items():
+            if source in owners:
+                problems.append(f"{source} was built by shards {owners[source]} and {index}")
+                continue
+            owners[source] = index
+            merged.pages[source] = entry
+    for source in sorted(set(expected_sources) - set(owners)):
+        problems.append(f"{source} was not built by any shard")
+    for source in sorted(set(owners) - set(expected_sources)):
+        problems.append(f"{source} was built but no longer exists")
+    if problems:
+        raise ShardMergeError(problems)
+    return merged
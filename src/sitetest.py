@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+from builder import Site
+
+
+# Base for tests that build a Site in a throwaway tree laid out like the real
+# one (content/, static/, template.html -> docs/). make_site() keeps every
+# state file inside that tree; tests pass only the options they exercise.
+class SiteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def write(self, name, text):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb" if isinstance(text, bytes) else "w") as f:
+            f.write(text)
+        return path
+
+    def read(self, *parts):
+        with open(self.path(*parts)) as f:
+            return f.read()
+
+    def make_site(self, **options):
+        config = {
+            "content_dir": self.path("content"),
+            "static_dir": self.path("static"),
+            "template_path": self.path("template.html"),
+            "dest_dir": self.path("docs"),
+            "manifest_path": self.path("manifest.json"),
+            "delta_path": self.path("delta.json"),
+            "cache_dir": None,
+        }
+        config.update(options)
+        return Site(**config)
@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+
+from manifest import hash_file
+from output import ADDED, CHANGED
+
+
+def list_files(root):
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            files.append(os.path.relpath(os.path.join(dirpath, name), root))
+    return files
+
+
+def is_unchanged(src_path, dst_path):
+    try:
+        src_stat = os.stat(src_path)
+        dst_stat = os.stat(dst_path)
+    except FileNotFoundError:
+        return False
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+        return True
+    if src_stat.st_mtime_ns == dst_stat.st_mtime_ns:
+        return True
+    if hash_file(src_path) == hash_file(dst_path):
+        shutil.copystat(src_path, dst_path)
+        return True
+    return False
+
+
+def _copy_contents(src_path, dst_path):
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src_path, "rb") as fsrc, open(dst_path, "wb") as fdst:
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                    pass
+            return
+        except OSError:
+            pass
+    shutil.copyfile(src_path, dst_path)
+
+
+def copy_file(src_path, dst_path, hardlink=False):
+    directory = os.path.dirname(dst_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=".tmp-")
+    os.close(fd)
+    try:
+        if hardlink:
+            os.remove(tmp_path)
+            try:
+                os.link(src_path, tmp_path)
+                os.replace(tmp_path, dst_path)
+                return
+            except OSError:
+                pass
+        _copy_contents(src_path, tmp_path)
+        shutil.copystat(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def remove_file(path, root):
+    if os.path.exists(path):
+        os.remove(path)
+    parent = os.path.dirname(path)
+    while parent and os.path.abspath(parent) != os.path.abspath(root):
+        if not os.path.isdir(parent) or os.listdir(parent):
+            break
+        os.rmdir(parent)
+        parent = os.path.dirname(parent)
+
+
+# A renamed (fingerprinted) file is published under its original name as
+# well, since stylesheet url()s, raw HTML and outside links still use it.
+def sync_files(src, dst, previous_files=(), jobs=None, hardlink=False, delta=None, renames=None):
+    from concurrent.futures import ThreadPoolExecutor
+    renames = renames or {}
+    copies = []
+    for rel_path in list_files(src):
+        copies.append((rel_path, rel_path))
+        if rel_path in renames:
+            copies.append((rel_path, renames[rel_path]))
+    files = [dest_rel_path for _, dest_rel_path in copies]
+
+    def sync_one(copy):
+        src_path = os.path.join(src, copy[0])
+        dst_path = os.path.join(dst, copy[1])
+        if is_unchanged(src_path, dst_path):
+            return None
+        status = CHANGED if os.path.exists(dst_path) else ADDED
+        copy_file(src_path, dst_path, hardlink)
+        return status
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        statuses = list(executor.map(sync_one, copies))
+    for (rel_path, dest_rel_path), status in zip(copies, statuses):
+        if status is not None:
+            print(f"Copying {os.path.join(src, rel_path)} to {os.path.join(dst, dest_rel_path)}")
+            if delta is not None:
+                delta.record(os.path.join(dst, dest_rel_path), status)
+    for rel_path in sorted(set(previous_files) - set(files)):
+        dst_path = os.path.join(dst, rel_path)
+        print(f"Removing {dst_path}")
+        remove_file(dst_path, dst)
+        if delta is not None:
+            delta.remove(dst_path)
+    return files
@@ -0,0 +1,53 @@
+import re
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+
+
+class CompiledTemplate():
+    def __init__(self, segments, slots):
+        if len(segments) != len(slots) + 1:
+            raise ValueError("invalid template: segments and slots do not interleave")
+        self.segments = segments
+        self.slots = slots
+
+    def render(self, **values):
+        parts = [self.segments[0]]
+        for name, segment in zip(self.slots, self.segments[1:]):
+            parts.append(values[name])
+            parts.append(segment)
+        return "".join(parts)
+
+    def write(self, write, **values):
+        write(self.segments[0])
+        for name, segment in zip(self.slots, self.segments[1:]):
+            value = values[name]
+            if callable(value):
+                value(write)
+            else:
+                write(value)
+            write(segment)
+
+    def __repr__(self):
+        return f"CompiledTemplate(slots: {self.slots})"
+
+
+def compile_template(template_content, basepath=None, links=None):
+    if links is None and basepath:
+        from links import LinkResolver
+        links = LinkResolver(basepath)
+    if links is not None:
+        template_content = links.rewrite_html(template_content)
+    segments = []
+    slots = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(template_content):
+        segments.append(template_content[position : match.start()])
+        slots.append(match.group(1))
+        position = match.end()
+    segments.append(template_content[position:])
+    return CompiledTemplate(segments, slots)
+
+
+def load_template(template_path, basepath=None, links=None):
+    with open(template_path, "r") as template:
+        return compile_template(template.read(), basepath, links)
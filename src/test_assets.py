@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+
+from assets import AssetMap, fingerprint_files, fingerprint_path, strip_fingerprint
+from blockcache import BlockCache
+from blocks import markdown_to_html_node
+from links import LinkResolver
+from sitetest import SiteTestCase
+from template import compile_template
+
+
+class TestAssetMap(unittest.TestCase):
+    def setUp(self):
+        self.assets = AssetMap({"index.css": "index.0123456789.css", os.path.join("images", "a.png"): os.path.join("images", "a.abcdef0123.png")})
+
+    def test_fingerprint_names(self):
+        self.assertEqual(fingerprint_path(os.path.join("css", "site.min.css"), "deadbeef" * 8), os.path.join("css", "site.min.deadbeefde.css"))
+        self.assertEqual(strip_fingerprint("images/a.abcdef0123.png"), "images/a.png")
+        self.assertIsNone(strip_fingerprint("images/a.png"))
+
+    def test_url(self):
+        self.assertEqual(self.assets.url("/index.css"), "/index.0123456789.css")
+        self.assertEqual(self.assets.url("/images/a.png?v=1#top"), "/images/a.abcdef0123.png?v=1#top")
+        self.assertEqual(self.assets.url("/other.css"), "/other.css")
+        self.assertEqual(self.assets.url("index.css"), "index.css")
+
+    def test_template_is_rewritten_once(self):
+        template = compile_template('<link href="/index.css"><img src="/images/a.png">{{ Content }}', links=LinkResolver("/site/", assets=self.assets))
+        self.assertEqual(
+            template.render(Content='<a href="/index.css">'),
+            '<link href="/site/index.0123456789.css"><img src="/site/images/a.abcdef0123.png"><a href="/index.css">',
+        )
+
+    def test_markdown_props(self):
+        markdown = "![alt](/images/a.png) and [styles](/index.css)\n\n- [plain](/blog/)"
+        self.assertEqual(
+            markdown_to_html_node(markdown, links=LinkResolver(assets=self.assets)).to_html(),
+            '<div><p><img src="/images/a.abcdef0123.png" alt="alt"></img> and <a href="/index.0123456789.css">styles</a></p>'
+            '<ul><li><a href="/blog/">plain</a></li></ul></div>',
+        )
+
+    def test_cache_keys_follow_fingerprints(self):
+        with tempfile.TemporaryDirectory() as root:
+            cache = BlockCache(os.path.join(root, "blocks"))
+            markdown = "# Title\n\n![alt](/images/a.png)"
+            markdown_to_html_node(markdown, cache, links=LinkResolver(assets=self.assets))
+            changed = AssetMap({os.path.join("images", "a.png"): os.path.join("images", "a.ffffffffff.png")})
+            html = markdown_to_html_node(markdown, cache, links=LinkResolver(assets=changed)).to_html()
+            self.assertIn("a.ffffffffff.png", html)
+            self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+
+class TestSiteFingerprint(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", '<link href="/index.css" rel="stylesheet" />{{ Content }}')
+        self.write(os.path.join("content", "index.md"), "# Home\n\n![me](/images/me.png)")
+        self.write(os.path.join("content", "about.md"), "# About\n\nNo images")
+        self.write(os.path.join("static", "index.css"), "body {}")
+        self.write(os.path.join("static", "images", "me.png"), "png")
+        self.write(os.path.join("static", "robots.txt"), "User-agent: *")
+
+    def site(self):
+        return self.make_site(
+            basepath="/site/",
+            cache_dir=self.path("cache", "blocks"),
+            listing_dir=None,
+            fingerprint=True,
+        )
+
+    def test_build_copies_and_references_fingerprinted_names(self):
+        self.site().build()
+        renames = fingerprint_files(self.path("static"), ["index.css", os.path.join("images", "me.png"), "robots.txt"])
+        self.assertNotIn("robots.txt", renames)
+        css, png = renames["index.css"], renames[os.path.join("images", "me.png")]
+        self.assertEqual(sorted(os.listdir(self.path("docs"))), sorted(["about.html", "images", "index.css", "index.html", css, "robots.txt"]))
+        self.assertEqual(sorted(os.listdir(self.path("docs", "images"))), sorted(["me.png", os.path.basename(png)]))
+        self.assertIn(f'href="/site/{css}"', self.read("docs", "about.html"))
+        self.assertIn(f'src="/site/{png}"', self.read("docs", "index.html"))
+
+    def test_changed_asset_replaces_old_name_and_rerenders(self):
+        site = self.site()
+        site.build()
+        old_css = site.manifest.assets["index.css"]
+        self.write(os.path.join("static", "index.css"), "body { color: red }")
+        self.site().build()
+        new_css = fingerprint_files(self.path("static"), ["index.css"])["index.css"]
+        self.assertNotEqual(old_css, new_css)
+        self.assertFalse(os.path.exists(self.path("docs", old_css)))
+        self.assertEqual(self.read("docs", "index.css"), "body { color: red }")
+        self.assertIn(new_css, self.read("docs", "about.html"))
+
+    def test_turning_fingerprints_off_keeps_original_names(self):
+        site = self.site()
+        site.build()
+        css = site.manifest.assets["index.css"]
+        self.make_site(listing_dir=None).build()
+        self.assertFalse(os.path.exists(self.path("docs", css)))
+        self.assertEqual(self.read("docs", "index.css"), "body {}")
+        self.assertIn('href="/index.css"', self.read("docs", "about.html"))
+
+    def test_watch_rebuild_after_asset_change(self):
+        site = self.site()
+        site.build()
+        self.write(os.path.join("static", "images", "me.png"), "new png")
+        site.rebuild({self.path("static", "images", "me.png")})
+        png = site.manifest.assets[os.path.join("images", "me.png")]
+        self.assertIn(png, self.read("docs", "index.html"))
+        self.assertTrue(os.path.exists(self.path("docs", png)))
+
+
+if __name__ == "__main__":
+    unittest.main()
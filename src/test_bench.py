@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from bench.micro import compare_results
+
+
+def results(**timings):
+    return {"results": {name: {"best": best} for name, best in timings.items()}}
+
+
+class TestBench(unittest.TestCase):
+    def test_compare_results(self):
+        baseline = results(slower=1.0, faster=1.0, same=1.0, zero=0.0, removed=1.0)
+        current = results(slower=1.2, faster=0.5, same=1.05, zero=0.1, added=0.3)
+        self.assertEqual(compare_results(baseline, current), [
+            ("slower", 1.0, 1.2, 1.2, "REGRESSION"),
+            ("faster", 1.0, 0.5, 0.5, "faster"),
+            ("same", 1.0, 1.05, 1.05, "ok"),
+            ("zero", 0.0, 0.1, float("inf"), "REGRESSION"),
+            ("added", None, 0.3, None, "new"),
+        ])
+        self.assertEqual(compare_results(baseline, current, threshold=0.25)[0][4], "ok")
+
+    def test_memory_benchmark_runs_as_a_script(self):
+        script = os.path.join(ROOT_DIR, "bench", "memory.py")
+        result = subprocess.run([sys.executable, script, "1"], cwd=ROOT_DIR, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("slotted / __dict__", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
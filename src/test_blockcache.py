@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from blockcache import BlockCache
+from blocks import RENDERER_VERSION, markdown_to_html_node
+
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, "blocks")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_get_and_put(self):
+        cache = BlockCache(self.directory)
+        key = cache.key_for("# Title", RENDERER_VERSION)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "<h1>Title</h1>")
+        self.assertEqual(cache.get(key), "<h1>Title</h1>")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_persists_across_instances(self):
+        cache = BlockCache(self.directory)
+        key = cache.key_for("text", RENDERER_VERSION)
+        cache.put(key, "<p>text</p>")
+        reopened = BlockCache(self.directory)
+        self.assertEqual(reopened.get(key), "<p>text</p>")
+
+    def test_version_changes_key(self):
+        cache = BlockCache(self.directory)
+        self.assertNotEqual(cache.key_for("text", "1"), cache.key_for("text", "2"))
+
+    def test_lru_eviction(self):
+        cache = BlockCache(self.directory, max_bytes=10)
+        cache.put("aa1", "12345")
+        cache.put("bb2", "12345")
+        cache.get("aa1")
+        cache.put("cc3", "12345")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("bb2"))
+        self.assertEqual(cache.get("aa1"), "12345")
+        self.assertFalse(os.path.exists(os.path.join(self.directory, "bb", "bb2")))
+
+    def test_markdown_to_html_node_uses_cache(self):
+        md = "# Title\n\nFirst **para**\n\n- a\n- b"
+        cache = BlockCache(self.directory)
+        expected = markdown_to_html_node(md).to_html()
+        self.assertEqual(markdown_to_html_node(md, cache).to_html(), expected)
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        edited = md.replace("First", "Second")
+        self.assertEqual(markdown_to_html_node(edited, cache).to_html(), markdown_to_html_node(edited).to_html())
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
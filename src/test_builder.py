@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from sitetest import SiteTestCase
+
+
+class TestSite(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", '<title>{{ Title }}</title><link href="/index.css" />{{ Content }}')
+        self.write(os.path.join("content", "index.md"), "# Home\n\n[About](/about)")
+        self.write(os.path.join("static", "index.css"), "body {}")
+        self.site = self.make_site(basepath="/site/")
+
+    def test_render_markdown(self):
+        self.assertEqual(self.site.render_markdown("Go [home](/)"), '<p>Go <a href="/site/">home</a></p>')
+
+    def test_render_page_does_not_write(self):
+        html = self.site.render_page(self.path("content", "index.md"))
+        self.assertEqual(
+            html,
+            '<title>Home</title><link href="/site/index.css" /><h1>Home</h1><p><a href="/site/about">About</a></p>',
+        )
+        self.assertFalse(os.path.exists(self.path("docs")))
+
+    def test_build(self):
+        manifest = self.site.build()
+        self.assertEqual(list(manifest.pages), [self.path("content", "index.md")])
+        with open(self.path("docs", "index.html")) as f:
+            self.assertEqual(f.read(), self.site.render_page(self.path("content", "index.md")))
+        self.assertTrue(os.path.exists(self.path("docs", "index.css")))
+        self.assertTrue(os.path.exists(self.path("manifest.json")))
+
+    def test_build_delta(self):
+        self.site.build()
+        self.assertEqual(self.site.delta.to_dict(), {"added": ["index.css", "index.html"], "changed": [], "removed": []})
+        index_html = self.path("docs", "index.html")
+        os.utime(index_html, (0, 0))
+        self.write(os.path.join("docs", "leftover.html"), "old")
+        os.remove(self.path("manifest.json"))
+        self.site.manifest = None
+        self.site.build()
+        self.assertEqual(self.site.delta.to_dict(), {"added": [], "changed": [], "removed": ["leftover.html"]})
+        self.assertEqual(os.path.getmtime(index_html), 0)
+        self.write(os.path.join("content", "index.md"), "# Home\n\nEdited")
+        self.site.build()
+        with open(self.path("delta.json")) as f:
+            self.assertEqual(json.load(f), {"added": [], "changed": ["index.html"], "removed": []})
+
+    def test_importing_main_has_no_side_effects(self):
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        subprocess.run([sys.executable, "-c", f"import sys; sys.path.insert(0, {src_dir!r}); import main"], cwd=self.root, check=True)
+        self.assertEqual(sorted(os.listdir(self.root)), ["content", "static", "template.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import gzip
+import os
+import unittest
+from unittest import mock
+
+from compress import compress_files, gzip_file
+from output import ADDED, CHANGED, OutputDelta
+from sitetest import SiteTestCase
+
+
+class TestCompress(SiteTestCase):
+    def test_gzip_file_skips_up_to_date_and_unhelpful_output(self):
+        page = self.path("index.html")
+        self.write("index.html", "<p>hello</p>" * 100)
+        self.assertEqual(gzip_file(page), ADDED)
+        with gzip.open(page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 100)
+        self.assertIsNone(gzip_file(page))
+        self.write("index.html", "<p>changed</p>" * 100)
+        os.utime(page, ns=(0, 0))
+        self.assertEqual(gzip_file(page), CHANGED)
+        self.write("index.html", "x")
+        self.assertEqual(gzip_file(page), "removed")
+        self.assertFalse(os.path.exists(page + ".gz"))
+        self.assertIsNone(gzip_file(page))
+
+    def test_unhelpful_gzip_is_remembered_until_the_output_changes(self):
+        page = self.path("tiny.html")
+        self.write("tiny.html", "x")
+        skipped = {}
+        self.assertIsNone(gzip_file(page, skipped=skipped))
+        self.assertEqual(skipped, {page: os.stat(page).st_mtime_ns})
+        with mock.patch("gzip.compress") as compress:
+            self.assertIsNone(gzip_file(page, skipped=skipped))
+        compress.assert_not_called()
+        self.write("tiny.html", "<p>grown</p>" * 100)
+        os.utime(page, ns=(0, 0))
+        self.assertEqual(gzip_file(page, skipped=skipped), ADDED)
+        self.assertEqual(skipped, {})
+
+    def test_compress_files_only_text_outputs(self):
+        self.write("a.html", "<p>a</p>" * 50)
+        self.write("b.css", "body { color: red; }" * 50)
+        self.write("c.png", "png" * 50)
+        delta = OutputDelta(self.root)
+        written = compress_files([self.path(name) for name in ("a.html", "b.css", "c.png")], level=6, delta=delta)
+        self.assertEqual(written, 2)
+        self.assertEqual(delta.to_dict()["added"], ["a.html.gz", "b.css.gz"])
+        self.assertFalse(os.path.exists(self.path("c.png.gz")))
+
+    def test_site_build_writes_and_prunes_siblings(self):
+        self.write("template.html", "<html><title>{{ Title }}</title><body>{{ Content }}</body></html>")
+        self.write(os.path.join("content", "index.md"), "# Home\n\n" + "Welcome home. " * 50)
+        self.write(os.path.join("content", "old.md"), "# Old\n\n" + "Going away. " * 50)
+        self.write(os.path.join("static", "index.css"), "body { margin: 0; }" * 20)
+        site = self.make_site(gzip_level=9)
+        site.build()
+        for name in ("index.html", "old.html", "index.css"):
+            self.assertTrue(os.path.exists(self.path("docs", name + ".gz")))
+        os.remove(self.path("content", "old.md"))
+        site.manifest = None
+        site.build()
+        self.assertFalse(os.path.exists(self.path("docs", "old.html.gz")))
+        self.assertIn("old.html.gz", site.delta.removed)
+        self.assertEqual(site.delta.added, [])
+        self.assertTrue(os.path.exists(self.path("docs", "index.html.gz")))
+
+    def test_site_build_skips_outputs_gzip_did_not_shrink(self):
+        self.write("template.html", "{{ Content }}")
+        self.write(os.path.join("content", "index.md"), "# Hi")
+        os.makedirs(self.path("static"))
+        site = self.make_site(gzip_level=9)
+        site.build()
+        self.assertEqual(list(site.manifest.uncompressed), [self.path("docs", "index.html")])
+        site.manifest = None
+        with mock.patch("gzip.compress") as compress:
+            site.build()
+        compress.assert_not_called()
+        self.assertFalse(os.path.exists(self.path("docs", "index.html.gz")))
+
+    def test_static_gzip_files_are_published(self):
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join("content", "index.md"), "# Home\n\n" + "Welcome home. " * 50)
+        os.makedirs(self.path("static"))
+        with gzip.open(self.path("static", "data.tar.gz"), "wb") as f:
+            f.write(b"archive" * 100)
+        site = self.make_site(gzip_level=9)
+        site.build()
+        self.assertIn("data.tar.gz", site.delta.added)
+        self.assertEqual(site.delta.removed, [])
+        site.manifest = None
+        site.build()
+        self.assertTrue(os.path.exists(self.path("docs", "data.tar.gz")))
+        self.assertEqual(len(site.delta), 0)
+        os.remove(self.path("content", "index.md"))
+        site.rebuild({self.path("content", "index.md")})
+        self.assertTrue(os.path.exists(self.path("docs", "data.tar.gz")))
+        self.assertFalse(os.path.exists(self.path("docs", "index.html.gz")))
+        self.assertEqual(sorted(site.delta.removed), ["index.html", "index.html.gz"])
+
+
+if __name__ == "__main__":
+    unittest.main()
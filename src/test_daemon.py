@@ -0,0 +1,80 @@
+import os
+import threading
+import unittest
+
+from daemon import create_server, BuildDaemon, send_command
+from sitetest import SiteTestCase
+
+
+class TestBuildDaemon(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join("content", "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join("content", "blog", "post.md"), "# Post\n\nHello")
+        os.makedirs(self.path("static"))
+        site = self.make_site(cache_dir=self.path("cache"))
+        self.socket_path = self.path("build.sock")
+        self.daemon = BuildDaemon(site)
+        self.server = create_server(self.daemon, self.socket_path)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        super().tearDown()
+
+    def send(self, request):
+        logs = []
+        result = send_command(request, self.socket_path, logs.append)
+        return result, logs
+
+    def test_build_streams_progress(self):
+        result, logs = self.send({"command": "build"})
+        self.assertTrue(result["ok"])
+        self.assertEqual(result["pages"], 2)
+        self.assertTrue(any(line.startswith("Generating page from") for line in logs))
+        self.assertTrue(os.path.exists(self.path("docs", "blog", "post.html")))
+
+    def test_render_single_path(self):
+        self.send({"command": "build"})
+        self.write(os.path.join("content", "blog", "post.md"), "# Post\n\nEdited")
+        result, logs = self.send({"command": "render", "path": self.path("content", "blog", "post.md")})
+        self.assertTrue(result["ok"])
+        self.assertEqual(sum(line.startswith("Generating page") for line in logs), 1)
+        with open(self.path("docs", "blog", "post.html")) as f:
+            self.assertIn("Edited", f.read())
+
+    def test_invalidate_and_stats(self):
+        self.send({"command": "build"})
+        self.send({"command": "invalidate", "path": self.path("content", "index.md")})
+        _, logs = self.send({"command": "build"})
+        self.assertEqual(sum(line.startswith("Generating page") for line in logs), 1)
+        result, _ = self.send({"command": "stats"})
+        self.assertEqual(result["pages"], 2)
+        self.assertEqual(result["requests"], 4)
+        self.assertTrue(result["template_loaded"])
+        self.send({"command": "invalidate"})
+        _, logs = self.send({"command": "build"})
+        self.assertEqual(sum(line.startswith("Generating page") for line in logs), 2)
+
+    def test_render_failure_is_reported(self):
+        self.send({"command": "build"})
+        self.write(os.path.join("content", "blog", "post.md"), "No title here")
+        result, _ = self.send({"command": "render", "path": self.path("content", "blog", "post.md")})
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["failed"], [self.path("content", "blog", "post.md")])
+        self.assertIn("Title not found", result["error"])
+
+    def test_errors_are_reported(self):
+        result, _ = self.send({"command": "nope"})
+        self.assertFalse(result["ok"])
+        self.assertIn("unknown command", result["error"])
+        result, _ = self.send({"command": "render", "path": "/elsewhere/x.md"})
+        self.assertFalse(result["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
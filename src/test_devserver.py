@@ -0,0 +1,162 @@
+import os
+import threading
+import unittest
+from http.client import HTTPConnection
+
+from devserver import DevServer, PageCache, create_server, etag_matches
+from sitetest import SiteTestCase
+
+
+class TestPageCache(unittest.TestCase):
+    def test_lru_eviction_and_key_validation(self):
+        cache = PageCache(max_pages=2)
+        cache.put("a.md", 1, b"a")
+        cache.put("b.md", 1, b"b")
+        self.assertIsNotNone(cache.get("a.md", 1))
+        cache.put("c.md", 1, b"c")
+        self.assertIsNone(cache.get("b.md", 1))
+        self.assertIsNotNone(cache.get("a.md", 1))
+        self.assertIsNone(cache.get("a.md", 2))
+        self.assertEqual(len(cache), 2)
+
+
+class TestEtagMatches(unittest.TestCase):
+    def test_exact_values_from_a_list(self):
+        self.assertTrue(etag_matches('"a", "b"', '"b"'))
+        self.assertTrue(etag_matches("*", '"a"'))
+        self.assertTrue(etag_matches('W/"1-2"', 'W/"1-2"'))
+        self.assertTrue(etag_matches('"1-2"', 'W/"1-2"'))
+        self.assertFalse(etag_matches('"abc"', '"ab"'))
+        self.assertFalse(etag_matches('"xab", "abc"', 'ab'))
+        self.assertFalse(etag_matches(None, '"a"'))
+        self.assertFalse(etag_matches("", '"a"'))
+
+
+class TestDevServer(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", '<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        self.write(os.path.join("content", "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join("content", "blog", "post", "index.md"), "# Post\n\nHello")
+        self.write(os.path.join("content", "about.md"), "# About\n\nUs")
+        self.write(os.path.join("static", "index.css"), "body {}")
+        self.site = self.make_site()
+        self.dev = DevServer(self.site)
+        self.server = create_server(self.dev, port=0)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        super().tearDown()
+
+    def get(self, url, headers=None):
+        connection = HTTPConnection("127.0.0.1", self.server.server_port)
+        connection.request("GET", url, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read().decode("utf-8")
+        connection.close()
+        return response, body
+
+    def test_resolve(self):
+        content = self.path("content")
+        self.assertEqual(self.dev.resolve("/"), ("page", os.path.join(content, "index.md")))
+        self.assertEqual(self.dev.resolve("/blog/post/"), ("page", os.path.join(content, "blog", "post", "index.md")))
+        self.assertEqual(self.dev.resolve("/blog/post/index.html"), ("page", os.path.join(content, "blog", "post", "index.md")))
+        self.assertEqual(self.dev.resolve("/about.html"), ("page", os.path.join(content, "about.md")))
+        self.assertEqual(self.dev.resolve("/about?x=1"), ("page", os.path.join(content, "about.md")))
+        self.assertEqual(self.dev.resolve("/index.css"), ("static", os.path.join(self.path("static"), "index.css")))
+        self.assertEqual(self.dev.resolve("/../template.html"), (None, None))
+        self.assertEqual(self.dev.resolve("/missing/"), (None, None))
+
+    def test_basepath_prefix(self):
+        self.site.basepath = "/site/"
+        self.assertEqual(self.dev.resolve("/site"), ("page", os.path.join(self.path("content"), "index.md")))
+        self.assertEqual(self.dev.resolve("/index.css"), (None, None))
+
+    def test_fingerprinted_assets(self):
+        self.site.fingerprint = True
+        _, body = self.get("/about")
+        css = self.site.assets.files["index.css"]
+        self.assertIn(f'href="/{css}"', body)
+        response, body = self.get("/" + css)
+        self.assertEqual((response.status, body), (200, "body {}"))
+
+    def test_static_changes_rerender_fingerprinted_pages(self):
+        self.site.fingerprint = True
+        _, body = self.get("/about")
+        old_css = self.site.assets.files["index.css"]
+        self.assertIn(old_css, body)
+        _, body = self.get("/about")
+        self.assertEqual(self.dev.pages.hits, 1)
+        self.write(os.path.join("static", "index.css"), "body { color: red }")
+        _, body = self.get("/about")
+        new_css = self.site.assets.files["index.css"]
+        self.assertNotEqual(old_css, new_css)
+        self.assertIn(f'href="/{new_css}"', body)
+
+    def test_renders_only_visited_pages(self):
+        response, body = self.get("/blog/post/")
+        self.assertEqual(response.status, 200)
+        self.assertIn("<title>Post</title>", body)
+        self.assertIn("<p>Hello</p>", body)
+        self.assertEqual(len(self.dev.pages), 1)
+        self.assertFalse(os.path.exists(self.path("docs")))
+
+    def test_generated_listing(self):
+        response, body = self.get("/blog/")
+        self.assertEqual(response.status, 200)
+        self.assertIn('<a href="/blog/post/">Post</a>', body)
+
+    def test_listings_only_built_for_listing_urls(self):
+        calls = []
+        listing_pages = self.site.listing_pages
+        self.site.listing_pages = lambda: calls.append(1) or listing_pages()
+        self.assertEqual(self.get("/favicon.ico")[0].status, 404)
+        self.assertEqual(self.get("/nope/")[0].status, 404)
+        self.assertEqual(calls, [])
+        self.assertEqual(self.get("/blog/")[0].status, 200)
+        self.assertEqual(self.get("/blog/missing/")[0].status, 404)
+        self.assertEqual(len(calls), 1)
+        self.write(os.path.join("content", "blog", "post", "index.md"), "# Renamed\n\nHello")
+        _, body = self.get("/blog/")
+        self.assertIn(">Renamed</a>", body)
+        self.assertEqual(len(calls), 2)
+
+    def test_etag_and_not_modified(self):
+        response, _ = self.get("/")
+        etag = response.getheader("ETag")
+        response, body = self.get("/", {"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, "")
+        self.assertEqual(self.dev.pages.hits, 1)
+        response, _ = self.get("/index.css")
+        css_etag = response.getheader("ETag")
+        response, _ = self.get("/index.css", {"If-None-Match": f'"other", {css_etag}'})
+        self.assertEqual(response.status, 304)
+        response, body = self.get("/index.css", {"If-None-Match": css_etag[:-2] + '"'})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, "body {}")
+
+    def test_source_and_template_changes_rerender(self):
+        self.get("/")
+        self.write(os.path.join("content", "index.md"), "# Home\n\nChanged content")
+        _, body = self.get("/")
+        self.assertIn("Changed content", body)
+        self.write("template.html", "<h1>{{ Title }}</h1>{{ Content }}")
+        _, body = self.get("/")
+        self.assertIn("<h1>Home</h1>", body)
+
+    def test_missing_and_broken_pages(self):
+        response, _ = self.get("/nope/")
+        self.assertEqual(response.status, 404)
+        self.write(os.path.join("content", "broken.md"), "no title here")
+        response, body = self.get("/broken")
+        self.assertEqual(response.status, 500)
+        self.assertIn("Title not found", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
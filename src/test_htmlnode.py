@@ -1,8 +1,8 @@
 import unittest
 
-from blocks import BlockType, markdown_to_blocks, block_to_block_type, heading_level, block_type_to_html_tag, markdown_to_html_node, text_to_children
+from blocks import BlockType, scan_blocks, markdown_to_blocks, block_to_block_type, heading_level, block_type_to_html_tag, markdown_to_html_node, text_to_children
 from main import extract_title
-from text_to_markdown import extract_markdown_images, split_nodes_delimiter,extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes
+from text_to_markdown import extract_markdown_images, split_nodes_delimiter,extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, tokenize_inline, TEXT_DELIMITERS
 from textnode import TextNode, TextType, text_node_to_html_node
 from htmlnode import HTMLNode, LeafNode, ParentNode
 
@@ -99,6 +99,19 @@ class TestHtmlNode(unittest.TestCase):
         parent = ParentNode("div", [child], props=props)
         expected_html = '<div class="container" id="main-section"><p>Content</p></div>'
         self.assertEqual(parent.to_html(), expected_html)
+
+    def test_write_html_streams_chunks(self):
+        parent = ParentNode("div", [ParentNode("p", [LeafNode(None, "a "), LeafNode("b", "bold")])])
+        chunks = []
+        parent.write_html(chunks.append)
+        self.assertEqual(chunks, ["<div>", "<p>", "a ", "<b>bold</b>", "</p>", "</div>"])
+        self.assertEqual("".join(chunks), parent.to_html())
+
+    def test_write_children_html_skips_outer_tag(self):
+        parent = ParentNode("div", [LeafNode("p", "one"), LeafNode("p", "two")])
+        chunks = []
+        parent.write_children_html(chunks.append)
+        self.assertEqual("".join(chunks), "<p>one</p><p>two</p>")
     
 #tests for textnode to htmlnode conversion
 
@@ -453,6 +466,31 @@ class TestTextToTextNodes(unittest.TestCase):
             self.assertEqual(node.text, exp_text)
             self.assertEqual(node.text_type, exp_type)
 
+    def test_tokenize_matches_split_chain(self):
+        text = "![img](/a.png) **bold x** and [link](/b) `co**de` *it* tail"
+        nodes = [TextNode(text, TextType.TEXT)]
+        nodes = split_nodes_image(nodes)
+        nodes = split_nodes_link(nodes)
+        nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+        nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+        nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+        self.assertListEqual(tokenize_inline(text, TEXT_DELIMITERS), nodes)
+
+    def test_tokenize_unmatched_delimiter(self):
+        with self.assertRaises(Exception) as context:
+            text_to_textnodes("a **b c")
+        self.assertIn("unmatched delimiter", str(context.exception))
+
+    def test_tokenize_many_links(self):
+        text = " ".join(f"[l{i}](/p{i})" for i in range(2000))
+        nodes = text_to_textnodes(text)
+        self.assertEqual(len(nodes), 3999)
+        self.assertEqual(nodes[-1], TextNode("l1999", TextType.LINK, "/p1999"))
+
+    def test_text_to_children_emits_leaf_nodes(self):
+        children = text_to_children("a **b** [c](/d)")
+        self.assertEqual("".join(child.to_html() for child in children), 'a <b>b</b> <a href="/d">c</a>')
+
 # test for blocks.py
 
     def test_markdown_to_blocks(self):
@@ -536,6 +574,29 @@ class TestTextToTextNodes(unittest.TestCase):
                 ["Only one block\nwith two lines"],
             )
 
+    def test_scan_blocks_records(self):
+        md = "# Title\n\nSome text\nmore text\n\n- a\n- b"
+        blocks = list(scan_blocks(md))
+        self.assertEqual(
+            [(b.block_type, b.level, b.start, b.end, b.lines) for b in blocks],
+            [
+                (BlockType.heading, 1, 0, 1, ["# Title"]),
+                (BlockType.paragraph, None, 2, 4, ["Some text", "more text"]),
+                (BlockType.unordered_list, None, 5, 7, ["- a", "- b"]),
+            ],
+        )
+
+    def test_scan_blocks_fence_keeps_blank_lines(self):
+        md = "intro\n\n```\nfirst\n\n# not a heading\n```\nafter"
+        blocks = list(scan_blocks(md))
+        self.assertEqual([b.block_type for b in blocks], [BlockType.paragraph, BlockType.code, BlockType.paragraph])
+        self.assertEqual(blocks[1].lines, ["```", "first", "", "# not a heading", "```"])
+        self.assertEqual((blocks[1].start, blocks[1].end), (2, 7))
+
+    def test_scan_blocks_unclosed_fence_is_text(self):
+        md = "```\nnot closed\n\nnext"
+        self.assertEqual(markdown_to_blocks(md), ["```\nnot closed", "next"])
+
 # test for block_to_block_type
 
     def test_paragraph_simple(self):
@@ -680,6 +741,11 @@ class TestMarkdownToHtmlNodeCustom(unittest.TestCase):
             "<div><ol><li>first</li><li>second <code>code</code></li><li>third</li></ol></div>",
         )
 
+    def test_code_block_with_blank_line(self):
+        md = "```\nline one\n\nline two\n```"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html, "<div><pre><code>line one\n\nline two\n</code></pre></div>")
+
     def test_quote_block(self):
         md = """
             > this is **quoted**
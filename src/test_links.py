@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+from assets import AssetMap
+from blockcache import BlockCache
+from blocks import markdown_to_html_node
+from links import LinkResolver
+from sitetest import SiteTestCase
+
+
+class TestLinkResolver(unittest.TestCase):
+    def setUp(self):
+        assets = AssetMap({"index.css": "index.0123456789.css"})
+        self.links = LinkResolver("/site/", {"/", "/blog/", "/blog/index.html", "/about.html"}, assets)
+
+    def test_resolve(self):
+        self.assertEqual(self.links.resolve("/blog/"), "/site/blog/")
+        self.assertEqual(self.links.resolve("/about.html#team"), "/site/about.html#team")
+        self.assertEqual(self.links.resolve("/index.css?v=2"), "/site/index.0123456789.css?v=2")
+        self.assertEqual(self.links.resolve("/missing/"), "/site/missing/")
+        self.assertEqual(self.links.resolve("https://example.com/"), "https://example.com/")
+        self.assertEqual(self.links.resolve("//cdn.example/x.js"), "//cdn.example/x.js")
+        self.assertEqual(self.links.resolve("relative.png"), "relative.png")
+        self.assertEqual(LinkResolver().resolve("/blog/"), "/blog/")
+
+    def test_is_known(self):
+        self.assertTrue(self.links.is_known("/blog"))
+        self.assertTrue(self.links.is_known("/blog/index.html"))
+        self.assertTrue(self.links.is_known("/index.css"))
+        self.assertTrue(self.links.is_known("https://example.com/nowhere"))
+        self.assertFalse(self.links.is_known("/blog/missing/"))
+        self.assertTrue(LinkResolver("/").is_known("/anything/"))
+
+    def test_rewrites_nodes_not_text(self):
+        markdown = 'See [the blog](/blog/) and ![logo](/logo.png)\n\n```\n<a href="/raw">\n```'
+        html = markdown_to_html_node(markdown, links=self.links).to_html()
+        self.assertEqual(
+            html,
+            '<div><p>See <a href="/site/blog/">the blog</a> and <img src="/site/logo.png" alt="logo"></img></p>'
+            '<pre><code><a href="/raw">\n</code></pre></div>',
+        )
+
+    def test_signature_follows_basepath_and_assets(self):
+        self.assertEqual(LinkResolver("/site/", {"/x/"}).signature, LinkResolver("/site/").signature)
+        self.assertNotEqual(LinkResolver("/site/").signature, LinkResolver("/other/").signature)
+        self.assertNotEqual(LinkResolver("/site/").signature, self.links.signature)
+
+    def test_targets_have_block_lines_with_and_without_cache(self):
+        markdown = "# T\n\nIntro [a](/blog/) and\n[b](https://x.org/) ![c](/img/c.png)\n\n- [d](/blog/)\n- [e](/nope/#x)"
+        expected = [[3, "/blog/"], [3, "/img/c.png"], [6, "/blog/"], [6, "/nope/#x"]]
+        targets = []
+        markdown_to_html_node(markdown, links=self.links, targets=targets)
+        self.assertEqual(targets, expected)
+        with tempfile.TemporaryDirectory() as root:
+            cache = BlockCache(root)
+            for _ in range(2):
+                targets = []
+                markdown_to_html_node(markdown, cache, links=self.links, targets=targets)
+                self.assertEqual(targets, expected)
+            self.assertEqual(cache.hits, 3)
+
+
+class TestSiteLinkCheck(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "{{ Title }}{{ Content }}")
+        self.write(os.path.join("content", "index.md"), "---\ntitle: Home\n---\n# Home\n\n[about](/about.html) [post](/blog/post)\n\n![gone](/images/gone.png)")
+        self.write(os.path.join("content", "about.md"), "# About\n\n![me](/images/me%20too.png) [home](/#top) [old](/blog/old/)")
+        self.write(os.path.join("content", "blog", "post", "index.md"), "# Post\n\n[index](/blog/) and\n[tags](/blog/tags/x/)")
+        self.write(os.path.join("static", "images", "me too.png"), "png")
+
+    def site(self, jobs=1, check_links=True):
+        return self.make_site(
+            basepath="/site/",
+            cache_dir=self.path("cache", "blocks"),
+            jobs=jobs,
+            check_links=check_links,
+        )
+
+    def test_single_page_render_skips_route_table(self):
+        site = self.site(check_links=False)
+        site.site_paths = lambda: self.fail("route table built without --check-links")
+        self.assertIn('<a href="/site/about.html">', site.render_page(self.path("content", "index.md")))
+
+    def test_reports_source_and_line(self):
+        site = self.site(jobs=2)
+        site.build()
+        self.assertEqual(site.broken_links, [
+            (self.path("content", "about.md"), 3, "/blog/old/"),
+            (self.path("content", "blog", "post", "index.md"), 4, "/blog/tags/x/"),
+            (self.path("content", "index.md"), 8, "/images/gone.png"),
+        ])
+
+    def test_unchanged_pages_are_checked_against_new_routes(self):
+        self.site().build()
+        self.write(os.path.join("content", "blog", "old", "index.md"), "# Old")
+        os.remove(self.path("content", "about.md"))
+        site = self.site()
+        site.build()
+        self.assertEqual([url for _, _, url in site.broken_links], ["/blog/tags/x/", "/about.html", "/images/gone.png"])
+        self.write(os.path.join("content", "about.md"), "# About again")
+        site.rebuild({self.path("content", "about.md")})
+        self.assertEqual([url for _, _, url in site.broken_links], ["/blog/tags/x/", "/images/gone.png"])
+
+
+if __name__ == "__main__":
+    unittest.main()
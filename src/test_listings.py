@@ -0,0 +1,97 @@
+import os
+import unittest
+
+from listings import build_listings, slugify, sort_posts, url_for
+from sitetest import SiteTestCase
+
+
+def post(name, date=None, tags=None):
+    data = {"title": name.title(), "url": f"/blog/{name}/", "dest": f"docs/blog/{name}/index.html"}
+    if date is not None:
+        data["date"] = date
+    if tags is not None:
+        data["tags"] = tags
+    return data
+
+
+class TestListingPages(unittest.TestCase):
+    def test_helpers(self):
+        self.assertEqual(slugify("Static Sites!"), "static-sites")
+        self.assertEqual(url_for(os.path.join("docs", "blog", "index.html"), "docs"), "/blog/")
+        self.assertEqual(url_for(os.path.join("docs", "about.html"), "docs"), "/about.html")
+        posts = [post("b"), post("old", "2023-01-01"), post("a"), post("new", "2024-01-01")]
+        self.assertEqual([p["title"] for p in sort_posts(posts)], ["New", "Old", "A", "B"])
+
+    def test_pagination_and_tags(self):
+        posts = [post(f"p{i}", f"2024-01-{i + 10}", ["python"] if i % 2 else ["Python", "web"]) for i in range(5)]
+        pages = build_listings(posts, "docs", "blog", page_size=2)
+        dests = [page.dest for page in pages]
+        self.assertEqual(dests[:3], [
+            os.path.join("docs", "blog", "index.html"),
+            os.path.join("docs", "blog", "page", "2", "index.html"),
+            os.path.join("docs", "blog", "page", "3", "index.html"),
+        ])
+        self.assertIn(os.path.join("docs", "blog", "tags", "python", "index.html"), dests)
+        self.assertIn(os.path.join("docs", "blog", "tags", "web", "page", "2", "index.html"), dests)
+        first = pages[0]
+        self.assertEqual([entry["title"] for entry in first.entries()], ["P4", "P3"])
+        html = first.to_html_node().to_html()
+        self.assertIn('<a href="/blog/p4/">P4</a>', html)
+        self.assertIn('<a href="/blog/tags/python/" rel="tag">Python</a>', html)
+        self.assertIn('<a href="/blog/page/2/" rel="next">Older posts</a>', html)
+        self.assertEqual(pages[1].newer_url, "/blog/")
+
+
+class TestSiteListings(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join("content", "index.md"), "# Home")
+        for i in range(5):
+            self.write_post(i, f"Post {i}")
+        os.makedirs(self.path("static"))
+        self.site = self.make_site(basepath="/site/", page_size=2)
+
+    def write_post(self, i, title):
+        tags = "[odd]" if i % 2 else "[even]"
+        self.write(os.path.join("content", "blog", f"post{i}", "index.md"), f"---\ndate: 2024-02-0{i + 1}\ntags: {tags}\n---\n# {title}\n\nBody")
+
+    def test_build_generates_listings(self):
+        manifest = self.site.build()
+        index = self.read("docs", "blog", "index.html")
+        self.assertTrue(index.startswith("<title>Blog</title>"))
+        self.assertIn('<a href="/site/blog/post4/">Post 4</a>', index)
+        self.assertIn('<a href="/site/blog/tags/even/" rel="tag">even</a>', index)
+        self.assertTrue(os.path.exists(self.path("docs", "blog", "page", "3", "index.html")))
+        self.assertTrue(os.path.exists(self.path("docs", "blog", "tags", "odd", "index.html")))
+        self.assertEqual(len(manifest.listings), 3 + 2 + 1)
+        self.assertNotIn(self.path("content", "blog", "index.md"), manifest.pages)
+
+    def test_only_listings_containing_a_changed_post_are_regenerated(self):
+        self.site.build()
+        for dest in self.site.manifest.listings:
+            os.utime(dest, (0, 0))
+        self.write_post(0, "Post zero renamed")
+        self.site.rebuild({self.path("content", "blog", "post0", "index.md")})
+        changed = {os.path.relpath(dest, self.path("docs")) for dest in self.site.manifest.listings if os.path.getmtime(dest) != 0}
+        self.assertEqual(changed, {os.path.join("blog", "page", "3", "index.html"), os.path.join("blog", "tags", "even", "page", "2", "index.html")})
+        self.assertIn("Post zero renamed", self.read("docs", "blog", "page", "3", "index.html"))
+
+    def test_removed_tag_pages_are_deleted(self):
+        self.site.build()
+        for i in (1, 3):
+            os.remove(self.path("content", "blog", f"post{i}", "index.md"))
+        self.site.manifest = None
+        self.site.build()
+        self.assertFalse(os.path.exists(self.path("docs", "blog", "tags", "odd")))
+        self.assertIn("blog/tags/odd/index.html", self.site.delta.removed)
+
+    def test_content_index_wins(self):
+        self.write(os.path.join("content", "blog", "index.md"), "# Handwritten")
+        self.site.build()
+        self.assertIn("Handwritten", self.read("docs", "blog", "index.html"))
+        self.assertNotIn(self.path("docs", "blog", "index.html"), self.site.manifest.listings)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from builder import BuildError, collect_pages, generate_pages
+from main import parse_args
+
+
+class TestParallelGeneration(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        for i in range(4):
+            self.write_page(os.path.join("section", f"page{i}.md"), f"# Page {i}\n\nBody {i}")
+        self.write_page("index.md", "# Home\n\nWelcome")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_page(self, name, markdown):
+        path = os.path.join(self.content, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(markdown)
+
+    def read_output(self, name):
+        with open(os.path.join(self.dest, name)) as f:
+            return f.read()
+
+    def test_collect_pages_is_sorted(self):
+        pages = collect_pages(self.content, self.dest)
+        self.assertEqual(
+            [os.path.relpath(dest, self.dest) for _, dest in pages],
+            ["index.html"] + [os.path.join("section", f"page{i}.html") for i in range(4)],
+        )
+
+    def test_parallel_matches_serial(self):
+        pages = collect_pages(self.content, self.dest)
+        generate_pages(pages, self.template, "/", jobs=1)
+        serial = [self.read_output(os.path.relpath(dest, self.dest)) for _, dest in pages]
+        generate_pages(pages, self.template, "/", jobs=3)
+        parallel = [self.read_output(os.path.relpath(dest, self.dest)) for _, dest in pages]
+        self.assertEqual(serial, parallel)
+        self.assertIn("<title>Page 2</title>", parallel[3])
+
+    def test_parallel_reports_every_failure(self):
+        self.write_page(os.path.join("section", "page1.md"), "no title here")
+        self.write_page(os.path.join("section", "page3.md"), "still no title")
+        pages = collect_pages(self.content, self.dest)
+        with self.assertRaises(BuildError) as context:
+            generate_pages(pages, self.template, "/", jobs=2)
+        failed = [os.path.basename(path) for path, _ in context.exception.failures]
+        self.assertEqual(failed, ["page1.md", "page3.md"])
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "section", "page2.html")))
+
+    def test_parse_args(self):
+        args = parse_args(["/site/", "--jobs", "4"])
+        self.assertEqual(args.basepath, "/site/")
+        self.assertEqual(args.jobs, 4)
+        self.assertEqual(parse_args([]).basepath, "/")
+
+
+if __name__ == "__main__":
+    unittest.main()
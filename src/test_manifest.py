@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+from manifest import BuildManifest, hash_file, load_manifest, save_manifest
+from builder import generate_pages_recursive, remove_stale_pages
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.write_page("index.md", "# Home\n\nWelcome")
+        self.write_page(os.path.join("blog", "post.md"), "# Post\n\nHello")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_page(self, name, markdown):
+        with open(os.path.join(self.content, name), "w") as f:
+            f.write(markdown)
+
+    def build(self, previous, basepath="/"):
+        manifest = BuildManifest(hash_file(self.template), basepath)
+        generate_pages_recursive(self.content, self.template, self.dest, basepath, manifest, previous)
+        remove_stale_pages(manifest, previous, self.dest)
+        return manifest
+
+    def test_save_and_load_round_trip(self):
+        path = os.path.join(self.root, "manifest.json")
+        manifest = BuildManifest("abc", "/", {"a.md": {"hash": "1", "dest": "a.html"}})
+        save_manifest(manifest, path)
+        loaded = load_manifest(path)
+        self.assertEqual(loaded.to_dict(), manifest.to_dict())
+        self.assertEqual(os.listdir(self.root).count("manifest.json"), 1)
+        self.assertFalse(any(name.startswith(".tmp-") for name in os.listdir(self.root)))
+
+    def test_load_missing_or_corrupt(self):
+        path = os.path.join(self.root, "manifest.json")
+        self.assertIsNone(load_manifest(path))
+        with open(path, "w") as f:
+            f.write("{not json")
+        self.assertIsNone(load_manifest(path))
+
+    def test_unchanged_pages_are_skipped(self):
+        first = self.build(None)
+        index_html = os.path.join(self.dest, "index.html")
+        os.utime(index_html, (0, 0))
+        self.write_page(os.path.join("blog", "post.md"), "# Post\n\nEdited")
+        self.build(first)
+        self.assertEqual(os.path.getmtime(index_html), 0)
+        with open(os.path.join(self.dest, "blog", "post.html")) as f:
+            self.assertIn("Edited", f.read())
+
+    def test_basepath_change_rebuilds_everything(self):
+        # Output is only rewritten when its bytes change, so the page needs
+        # a link for the new basepath to show up in it.
+        self.write_page("index.md", "# Home\n\n[Post](/blog/post)")
+        first = self.build(None)
+        index_html = os.path.join(self.dest, "index.html")
+        os.utime(index_html, (0, 0))
+        self.build(first, basepath="/site/")
+        self.assertNotEqual(os.path.getmtime(index_html), 0)
+
+    def test_deleted_source_removes_output(self):
+        first = self.build(None)
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        second = self.build(first)
+        self.assertNotIn(os.path.join(self.content, "blog", "post.md"), second.pages)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
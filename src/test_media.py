@@ -0,0 +1,110 @@
+import os
+import struct
+import unittest
+
+from blocks import markdown_to_html_node
+import media
+from links import LinkResolver
+from media import ImageSizeCache, image_size, inline_stylesheets
+from sitetest import SiteTestCase
+
+PNG = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", 640, 480) + b"\x08\x06\x00\x00\x00" + b"\x00" * 64
+GIF = b"GIF89a" + struct.pack("<HH", 32, 16) + b"\x00" * 64
+JPEG = (
+    b"\xff\xd8"
+    + b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    + b"\xff\xc2" + struct.pack(">H", 11) + b"\x08" + struct.pack(">HH", 300, 400) + b"\x01\x01\x11\x00"
+    + b"\x00" * 64
+)
+
+
+class TestMedia(SiteTestCase):
+    def test_image_size_from_headers(self):
+        self.assertEqual(image_size(self.write("a.png", PNG)), [640, 480])
+        self.assertEqual(image_size(self.write("a.gif", GIF)), [32, 16])
+        self.assertEqual(image_size(self.write("a.jpg", JPEG)), [400, 300])
+        self.assertIsNone(image_size(self.write("a.webp", b"RIFF....WEBP")))
+        self.assertIsNone(image_size(self.write("b.jpg", JPEG[:24])))
+
+    def test_size_cache_is_keyed_by_hash(self):
+        cache_path = os.path.join(self.root, "images.json")
+        cache = ImageSizeCache(cache_path)
+        path = self.write("a.png", PNG)
+        self.assertEqual(cache.get(path), [640, 480])
+        cache.save()
+        cache = ImageSizeCache(cache_path)
+        self.write("b.png", PNG)
+        self.assertEqual(cache.get(os.path.join(self.root, "b.png")), [640, 480])
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_size_cache_only_hashes_on_stat_change(self):
+        cache_path = os.path.join(self.root, "images.json")
+        path = self.write("a.png", PNG)
+        cache = ImageSizeCache(cache_path)
+        cache.get(path)
+        cache.save()
+        cache = ImageSizeCache(cache_path)
+        self.assertEqual(cache.get(path), [640, 480])
+        self.assertEqual(cache.hashed, 0)
+        self.write("a.png", GIF)
+        os.utime(path, ns=(0, 0))
+        self.assertEqual(cache.get(path), [32, 16])
+        self.assertEqual(cache.hashed, 1)
+
+    def test_inline_stylesheets(self):
+        self.write(os.path.join("static", "small.css"), b"body { margin: 0 }\n")
+        self.write(os.path.join("static", "big.css"), b"p {}" * 100)
+        self.write(os.path.join("static", "bg.css"), b"body { background: url(bg.png) }")
+        self.write("secret.css", b"secret {}")
+        static = os.path.join(self.root, "static")
+        html = (
+            '<link href="/small.css" rel="stylesheet" /><link rel="stylesheet" href="/big.css">'
+            '<link href="/bg.css" rel="stylesheet"><link href="/small.css" rel="preload">'
+            '<link href="/../secret.css" rel="stylesheet"><link href="/small.css" rel="stylesheet" media="print">'
+        )
+        self.assertEqual(
+            inline_stylesheets(html, static, limit=64),
+            '<style>body { margin: 0 }</style><link rel="stylesheet" href="/big.css">'
+            '<link href="/bg.css" rel="stylesheet"><link href="/small.css" rel="preload">'
+            '<link href="/../secret.css" rel="stylesheet"><link href="/small.css" rel="stylesheet" media="print">',
+        )
+
+    def test_image_props_and_lazy_loading(self):
+        links = LinkResolver("/site/", images={"/a.png": [640, 480]})
+        markdown = "\n\n".join(["# T", "![a](/a.png)", "text", "text", "![a](/a.png?x) ![b](https://x.org/b.png)"])
+        html = markdown_to_html_node(markdown, links=links).to_html()
+        self.assertIn('<img src="/site/a.png" alt="a" width="640" height="480"></img></p><p>text', html)
+        self.assertIn('<img src="/site/a.png?x" alt="a" width="640" height="480" loading="lazy"></img>', html)
+        self.assertIn('<img src="https://x.org/b.png" alt="b" loading="lazy"></img>', html)
+        self.assertNotIn("width", markdown_to_html_node(markdown, links=LinkResolver("/site/")).to_html())
+
+    def test_site_rerenders_when_inlined_css_changes(self):
+        self.write("template.html", b'<link href="/index.css" rel="stylesheet">{{ Content }}')
+        self.write(os.path.join("content", "index.md"), b"# Home\n\n![me](/me.png)")
+        self.write(os.path.join("static", "index.css"), b"body {}")
+        self.write(os.path.join("static", "me.png"), PNG)
+        site = self.make_site(cache_dir=self.path("cache", "blocks"), optimize=True)
+        site.build()
+        output = os.path.join(self.root, "docs", "index.html")
+        with open(output) as f:
+            self.assertEqual(f.read(), '<style>body {}</style><h1>Home</h1><p><img src="/me.png" alt="me" width="640" height="480"></img></p>')
+        self.write(os.path.join("static", "index.css"), b"body { color: red }")
+        site.rebuild({os.path.join(self.root, "static", "index.css")})
+        with open(output) as f:
+            self.assertTrue(f.read().startswith("<style>body { color: red }</style>"))
+        inlined = []
+        original = media.inline_stylesheets
+        media.inline_stylesheets = lambda *args: inlined.append(args) or original(*args)
+        try:
+            self.write("template.html", b'<link href="/index.css" rel="stylesheet"><main>{{ Content }}</main>')
+            self.write(os.path.join("static", "index.css"), b"body { color: blue }")
+            site.rebuild({os.path.join(self.root, "template.html"), os.path.join(self.root, "static", "index.css")})
+        finally:
+            media.inline_stylesheets = original
+        self.assertEqual(len(inlined), 1)
+        with open(output) as f:
+            self.assertTrue(f.read().startswith("<style>body { color: blue }</style><main>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import unittest
+
+from metadata import MetadataCache, read_metadata, split_front_matter
+from sitetest import SiteTestCase
+
+
+POST = """---
+title: "Hello, world"
+date: 2024-05-01
+tags: [python, "static sites"]
+---
+# Ignored heading
+
+Body text.
+"""
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split_front_matter(self):
+        metadata, body = split_front_matter(POST)
+        self.assertEqual(metadata, {"title": "Hello, world", "date": "2024-05-01", "tags": ["python", "static sites"]})
+        self.assertEqual(body, "# Ignored heading\n\nBody text.\n")
+
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n\n---\n"), ({}, "# Title\n\n---\n"))
+        self.assertEqual(split_front_matter("---\n"), ({}, "---\n"))
+        self.assertEqual(split_front_matter("---\n# Body\n"), ({}, "---\n# Body\n"))
+        with self.assertRaises(ValueError):
+            split_front_matter("---\nnot a key\n---\n# Body")
+
+
+class TestMetadataReader(SiteTestCase):
+    def test_read_metadata_uses_first_h1(self):
+        path = self.write("a.md", "---\ndate: 2024-01-02\n---\nIntro\n\n# Real Title\n\n# Later")
+        self.assertEqual(read_metadata(path), {"date": "2024-01-02", "title": "Real Title"})
+        path = self.write("b.md", "# Plain\n\nNo header")
+        self.assertEqual(read_metadata(path), {"title": "Plain"})
+        path = self.write("c.md", "---\n\n# After a rule\n")
+        self.assertEqual(read_metadata(path), {"title": "After a rule"})
+
+    def test_cache_by_hash_survives_reload(self):
+        cache_path = os.path.join(self.root, "metadata.json")
+        path = self.write("a.md", POST)
+        cache = MetadataCache(cache_path)
+        self.assertEqual(cache.get(path)["title"], "Hello, world")
+        cache.save()
+        reloaded = MetadataCache(cache_path)
+        self.assertEqual(reloaded.get(path)["tags"], ["python", "static sites"])
+        self.assertEqual((reloaded.hits, reloaded.misses), (1, 0))
+        reloaded.save()
+        self.write("a.md", "# Changed")
+        changed = MetadataCache(cache_path)
+        self.assertEqual(changed.get(path), {"title": "Changed"})
+        changed.save(prune=True)
+        self.assertEqual(len(MetadataCache(cache_path)), 1)
+
+    def test_site_collection_and_render(self):
+        self.write(os.path.join("content", "blog", "one.md"), POST)
+        self.write(os.path.join("content", "blog", "two", "index.md"), "# Two\n\nSecond")
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        site = self.make_site(cache_dir=self.path("cache", "blocks"))
+        posts = site.collection("blog")
+        self.assertEqual([post["title"] for post in posts], ["Hello, world", "Two"])
+        self.assertEqual(posts[1]["dest"], os.path.join(self.root, "docs", "blog", "two", "index.html"))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "cache", "metadata.json")))
+        html = site.render_page(os.path.join(self.root, "content", "blog", "one.md"))
+        self.assertTrue(html.startswith("<title>Hello, world</title><h1>Ignored heading</h1>"))
+        self.assertNotIn("date:", html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from output import ADDED, CHANGED, DEFAULT_MODE, WRITE_BUFFER_SIZE, HashingWriter, OutputDelta, write_if_changed
+
+
+class TestWriteIfChanged(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_added_unchanged_changed(self):
+        path = os.path.join(self.root, "out", "index.html")
+        self.assertEqual(write_if_changed(path, b"<p>hi</p>"), ADDED)
+        os.utime(path, (0, 0))
+        self.assertIsNone(write_if_changed(path, b"<p>hi</p>"))
+        self.assertEqual(os.path.getmtime(path), 0)
+        self.assertEqual(write_if_changed(path, b"<p>yo</p>"), CHANGED)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"<p>yo</p>")
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["index.html"])
+
+    def stream(self, path, chunks):
+        out = HashingWriter(path)
+        written = []
+        sink = out.sink
+        out.sink = lambda data: (written.append(len(data)), sink(data))
+        for chunk in chunks:
+            out(chunk)
+        return out.commit(), written
+
+    def test_streamed_added_unchanged_changed(self):
+        path = os.path.join(self.root, "out", "index.html")
+        chunks = ["<p>", "x" * WRITE_BUFFER_SIZE, "é</p>"]
+        status, written = self.stream(path, chunks)
+        self.assertEqual(status, ADDED)
+        self.assertEqual(len(written), 2)
+        os.utime(path, (0, 0))
+        self.assertIsNone(self.stream(path, chunks)[0])
+        self.assertEqual(os.path.getmtime(path), 0)
+        self.assertEqual(self.stream(path, ["<p>yo</p>"])[0], CHANGED)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"<p>yo</p>")
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["index.html"])
+
+    def test_outputs_are_readable_under_umask_022(self):
+        script = (
+            "import os, sys; os.umask(0o022)\n"
+            "from output import HashingWriter, write_if_changed\n"
+            "write_if_changed(os.path.join(sys.argv[1], 'a.html'), b'<p>a</p>')\n"
+            "out = HashingWriter(os.path.join(sys.argv[1], 'b.html')); out('<p>b</p>'); out.commit()\n"
+        )
+        subprocess.run([sys.executable, "-c", script, self.root], cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        for name in ("a.html", "b.html"):
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.root, name)).st_mode), 0o644)
+
+    def test_rewritten_outputs_keep_their_mode(self):
+        path = os.path.join(self.root, "index.html")
+        write_if_changed(path, b"<p>hi</p>")
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), DEFAULT_MODE)
+        os.chmod(path, 0o640)
+        write_if_changed(path, b"<p>yo</p>")
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o640)
+        self.stream(path, ["<p>streamed</p>"])
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o640)
+
+    def test_discard_leaves_existing_output(self):
+        path = os.path.join(self.root, "index.html")
+        write_if_changed(path, b"old")
+        out = HashingWriter(path)
+        out("new")
+        out.discard()
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"old")
+        self.assertEqual(os.listdir(self.root), ["index.html"])
+
+    def test_delta_paths_are_relative_to_root(self):
+        delta = OutputDelta(self.root)
+        delta.record(os.path.join(self.root, "blog", "a.html"), ADDED)
+        delta.record(os.path.join(self.root, "b.html"), CHANGED)
+        delta.record(os.path.join(self.root, "c.html"), None)
+        delta.remove(os.path.join(self.root, "old.html"))
+        self.assertEqual(delta.to_dict(), {"added": ["blog/a.html"], "changed": ["b.html"], "removed": ["old.html"]})
+        self.assertEqual(len(delta), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
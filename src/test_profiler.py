@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+import unittest
+
+from blocks import markdown_to_html_node
+from builder import render_page
+from profiler import NULL_PROFILER, Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_null_profiler_is_inert(self):
+        with NULL_PROFILER.stage("read"):
+            pass
+        NULL_PROFILER.count("pages")
+        self.assertFalse(NULL_PROFILER.enabled)
+
+    def test_stages_and_counters(self):
+        profiler = Profiler()
+        with profiler.stage("read"):
+            pass
+        with profiler.stage("read"):
+            pass
+        profiler.count("pages", 2)
+        self.assertIn("read", profiler.stages)
+        self.assertEqual(profiler.counters, {"pages": 2})
+        self.assertEqual(profiler.events, [])
+
+    def test_markdown_to_html_node_counts_blocks(self):
+        profiler = Profiler()
+        markdown_to_html_node("# Title\n\nSome **bold** text", profiler=profiler)
+        self.assertEqual(profiler.counters["blocks"], 2)
+        self.assertEqual(profiler.counters["inline_nodes"], 4)
+        self.assertEqual(set(profiler.stages), {"blocks", "inline"})
+
+    def test_merge_and_report(self):
+        worker = Profiler(record_events=True)
+        with worker.page("a.md"):
+            with worker.stage("inline"):
+                pass
+        worker.count("pages")
+        parent = Profiler(record_events=True)
+        parent.merge(worker.to_data())
+        report = parent.report(top=5)
+        self.assertIn("inline", report)
+        self.assertIn("a.md", report)
+        self.assertEqual(len(parent.events), 2)
+
+    def test_render_page_profile_and_trace(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "index.md")
+            template = os.path.join(root, "template.html")
+            dest = os.path.join(root, "out", "index.html")
+            with open(source, "w") as f:
+                f.write("# Home\n\nHello")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            profiler = Profiler(record_events=True)
+            render_page(source, template, dest, "/", profiler=profiler)
+            for stage in ("template", "read", "blocks", "inline", "title", "serialize", "write"):
+                self.assertIn(stage, profiler.stages)
+            self.assertEqual(profiler.counters["bytes_written"], os.path.getsize(dest))
+            trace = os.path.join(root, "trace.json")
+            profiler.write_trace(trace)
+            with open(trace) as f:
+                events = json.load(f)["traceEvents"]
+            self.assertTrue(all(event["ph"] == "X" for event in events))
+
+
+if __name__ == "__main__":
+    unittest.main()
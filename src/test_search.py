@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import unittest
+
+from blockcache import BlockCache
+from blocks import markdown_to_html_node
+from search import SearchIndex, decode_ids, encode_ids, load_search_index, page_terms, shard_name
+from sitetest import SiteTestCase
+
+
+class TestSearchIndex(unittest.TestCase):
+    def test_page_terms(self):
+        self.assertEqual(page_terms(["Hello, hello World!", "a 42 x9 Élan"]), ["hello", "world", "x9", "élan"])
+
+    def test_encode_and_decode_ids(self):
+        self.assertEqual(encode_ids([40, 3, 5]), "3,2,z")
+        self.assertEqual(decode_ids(encode_ids([0, 7, 2000, 2001])), [0, 7, 2000, 2001])
+        self.assertEqual(decode_ids(""), [])
+
+    def test_shard_names(self):
+        self.assertEqual(shard_name("tolkien"), "to")
+        self.assertEqual(shard_name("x"), "x")
+        self.assertEqual(shard_name("élan"), "_c3a96c")
+
+    def test_incremental_updates_only_touch_affected_shards(self):
+        index = SearchIndex()
+        index.update("a.md", "1", "/a/", "A", ["apple", "banana"])
+        index.update("b.md", "1", "/b/", "B", ["banana", "cherry"])
+        self.assertEqual(index.shard_data("ba"), {"banana": "0,1"})
+        index.dirty = set()
+        index.update("b.md", "2", "/b/", "B", ["banana", "date"])
+        self.assertEqual(index.dirty, {"ba", "ch", "da"})
+        self.assertNotIn("cherry", index.postings)
+        index.remove("a.md")
+        index.update("c.md", "1", "/c/", "C", ["apple"])
+        self.assertEqual(index.pages["c.md"]["id"], 0)
+        self.assertEqual(index.urls, [["/c/", "C"], ["/b/", "B"]])
+
+    def test_block_cache_keeps_text(self):
+        with tempfile.TemporaryDirectory() as root:
+            cache = BlockCache(os.path.join(root, "blocks"))
+            markdown = "# Title\n\nSome **bold** [link](/x) ![alt text](/i.png)"
+            first, second = [], []
+            html = markdown_to_html_node(markdown, cache, text=first).to_html()
+            self.assertEqual(markdown_to_html_node(markdown, cache, text=second).to_html(), html)
+            self.assertEqual(cache.hits, 2)
+            self.assertEqual(first, second)
+            self.assertEqual(page_terms(first), ["alt", "bold", "link", "some", "text", "title"])
+
+
+class TestSiteSearch(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join("content", "index.md"), "# Home\n\nWelcome to the shire")
+        self.write(os.path.join("content", "blog", "ring", "index.md"), "# The Ring\n\nOne ring to rule them")
+        os.makedirs(self.path("static"))
+
+    def read_json(self, *parts):
+        with open(self.path(*parts)) as f:
+            return json.load(f)
+
+    def site(self, jobs=1):
+        return self.make_site(
+            basepath="/site/",
+            cache_dir=self.path("cache", "blocks"),
+            listing_dir=None,
+            jobs=jobs,
+            search=True,
+        )
+
+    def lookup(self, term):
+        pages = self.read_json("docs", "search", "pages.json")["pages"]
+        path = self.path("docs", "search", shard_name(term) + ".json")
+        shard = self.read_json(path) if os.path.exists(path) else {}
+        return [pages[page_id][0] for page_id in decode_ids(shard.get(term, ""))]
+
+    def test_build_writes_index(self):
+        self.site(jobs=2).build()
+        self.assertEqual(self.lookup("ring"), ["/site/blog/ring/"])
+        self.assertEqual(self.lookup("welcome"), ["/site/"])
+        self.assertEqual(sorted(self.lookup("the")), ["/site/", "/site/blog/ring/"])
+        self.assertTrue(os.path.exists(self.path("cache", "search.json")))
+
+    def test_incremental_update(self):
+        site = self.site()
+        site.build()
+        self.write(os.path.join("content", "index.md"), "# Home\n\nWelcome to rivendell")
+        site.rebuild({self.path("content", "index.md")})
+        self.assertEqual(self.lookup("rivendell"), ["/site/"])
+        self.assertFalse(os.path.exists(self.path("docs", "search", "sh.json")))
+        self.assertEqual(
+            sorted(site.delta.to_dict()["changed"] + site.delta.to_dict()["added"]),
+            ["index.html", "search/ri.json", "search/th.json"],
+        )
+        self.assertEqual(site.delta.removed, ["search/sh.json"])
+
+    def test_cold_site_reuses_saved_terms(self):
+        self.site().build()
+        fresh = self.site()
+        self.assertEqual(len(fresh.search_index), 2)
+        os.remove(self.path("content", "blog", "ring", "index.md"))
+        fresh.build()
+        self.assertEqual(self.lookup("ring"), [])
+        self.assertEqual(len(load_search_index(self.path("cache", "search.json"))), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import os
+import unittest
+
+from builder import collect_pages
+from shard import BALANCE_SLACK, ShardMergeError, assign_shards, parse_shard, shard_path
+from sitetest import SiteTestCase
+
+
+class TestShards(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        for i in range(9):
+            self.write(os.path.join("content", f"section{i % 3}", f"page{i}.md"), f"# Page {i}\n\n" + "text " * (10 * i + 1))
+        self.write(os.path.join("content", "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join("static", "index.css"), "body {}")
+
+    def site(self, shard=None, dest="docs"):
+        return self.make_site(
+            dest_dir=self.path(dest),
+            manifest_path=self.path(dest + "-manifest.json"),
+            delta_path=self.path(dest + "-delta.json"),
+            shard=shard,
+        )
+
+    def pages(self):
+        return collect_pages(self.path("content"), self.path("docs"))
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("0/4", "5/4", "x/4", "1"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+        self.assertEqual(shard_path("./.build-manifest.json", 2, 4), "./.build-manifest.shard-2-of-4.json")
+
+    def test_assignment_is_complete_stable_and_balanced(self):
+        pages = self.pages()
+        shards = assign_shards(pages, 3, self.path("content"))
+        self.assertEqual(sorted(page for shard in shards for page in shard), sorted(pages))
+        self.assertEqual(shards, assign_shards(list(reversed(pages)), 3, self.path("content")))
+        loads = [sum(os.path.getsize(source) + 1 for source, _ in shard) for shard in shards]
+        bound = sum(loads) * (1 + BALANCE_SLACK) / 3 + max(os.path.getsize(source) + 1 for source, _ in pages)
+        self.assertLessEqual(max(loads), bound)
+
+    def test_size_change_moves_few_pages(self):
+        for i in range(40):
+            self.write(os.path.join("content", "many", f"page{i}.md"), f"# Many {i}\n\n" + "word " * (50 + i % 7))
+        pages = self.pages()
+        owners = lambda shards: {page: index for index, shard in enumerate(shards) for page in shard}
+        before = owners(assign_shards(pages, 3, self.path("content")))
+        self.write(os.path.join("content", "many", "page7.md"), "# Many 7\n\n" + "word " * 120)
+        after = owners(assign_shards(pages, 3, self.path("content")))
+        moved = [page for page in pages if before[page] != after[page]]
+        self.assertLessEqual(len(moved), 2)
+
+    def test_shard_builds_merge_to_full_build(self):
+        for index in range(1, 4):
+            self.site((index, 3)).build()
+        merged = self.site().merge_shards(3)
+        full = self.site(dest="full").build()
+        self.assertEqual(sorted(merged.pages), sorted(full.pages))
+        for source, dest in self.pages():
+            with open(dest) as f:
+                self.assertIn("<title>", f.read())
+        self.assertTrue(os.path.exists(self.path("docs", "index.css")))
+        with open(self.path("docs-delta.json")) as f:
+            self.assertEqual(len(json.load(f)["added"]), len(self.pages()) + 1)
+
+    def test_merge_detects_missing_and_duplicated_pages(self):
+        for index in range(1, 3):
+            self.site((index, 2)).build()
+        with self.assertRaises(ShardMergeError):
+            self.site().merge_shards(3)
+        self.write(os.path.join("content", "late.md"), "# Late")
+        with self.assertRaises(ShardMergeError) as context:
+            self.site().merge_shards(2)
+        self.assertIn("late.md was not built by any shard", str(context.exception))
+        os.remove(self.path("content", "late.md"))
+        first = self.path(shard_path("docs-manifest.json", 1, 2))
+        second = self.path(shard_path("docs-manifest.json", 2, 2))
+        with open(first) as f:
+            data = json.load(f)
+        with open(second) as f:
+            other = json.load(f)
+        other["pages"].update(data["pages"])
+        with open(second, "w") as f:
+            json.dump(other, f)
+        with self.assertRaises(ShardMergeError) as context:
+            self.site().merge_shards(2)
+        self.assertIn("was built by shards 1 and 2", str(context.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
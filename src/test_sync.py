@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from sync import is_unchanged, list_files, sync_files
+
+
+class TestSyncFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dst = os.path.join(self.tmp.name, "docs")
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "a.png"), "png-bytes")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_initial_sync_copies_everything(self):
+        files = sync_files(self.src, self.dst)
+        self.assertEqual(files, ["index.css", os.path.join("images", "a.png")])
+        self.assertEqual(self.read(os.path.join(self.dst, "images", "a.png")), "png-bytes")
+        self.assertTrue(is_unchanged(os.path.join(self.src, "index.css"), os.path.join(self.dst, "index.css")))
+
+    def test_unchanged_files_are_not_rewritten(self):
+        files = sync_files(self.src, self.dst)
+        dst_css = os.path.join(self.dst, "index.css")
+        inode = os.stat(dst_css).st_ino
+        sync_files(self.src, self.dst, files)
+        self.assertEqual(os.stat(dst_css).st_ino, inode)
+
+    def test_same_content_different_mtime_is_kept(self):
+        sync_files(self.src, self.dst)
+        src_css = os.path.join(self.src, "index.css")
+        dst_css = os.path.join(self.dst, "index.css")
+        os.utime(src_css, (1000, 1000))
+        inode = os.stat(dst_css).st_ino
+        sync_files(self.src, self.dst)
+        self.assertEqual(os.stat(dst_css).st_ino, inode)
+        self.assertEqual(os.stat(dst_css).st_mtime, 1000)
+
+    def test_changed_file_is_copied(self):
+        sync_files(self.src, self.dst)
+        self.write(os.path.join(self.src, "index.css"), "body { color: red }")
+        sync_files(self.src, self.dst)
+        self.assertEqual(self.read(os.path.join(self.dst, "index.css")), "body { color: red }")
+
+    def test_removed_source_is_deleted_but_other_outputs_kept(self):
+        files = sync_files(self.src, self.dst)
+        self.write(os.path.join(self.dst, "index.html"), "<p>page</p>")
+        os.remove(os.path.join(self.src, "images", "a.png"))
+        sync_files(self.src, self.dst, files)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dst, "index.html")))
+
+    def test_hardlink(self):
+        sync_files(self.src, self.dst, hardlink=True)
+        src_css = os.path.join(self.src, "index.css")
+        dst_css = os.path.join(self.dst, "index.css")
+        self.assertTrue(os.path.samefile(src_css, dst_css))
+        self.assertEqual(list_files(self.dst), list_files(self.src))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from template import CompiledTemplate, compile_template
+
+
+class TestCompiledTemplate(unittest.TestCase):
+    def test_splits_into_segments_and_slots(self):
+        template = compile_template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.assertEqual(template.segments, ["<title>", "</title><body>", "</body>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_render(self):
+        template = compile_template("<title>{{ Title }}</title>{{ Content }}")
+        html = template.render(Title="Home", Content="<p>hi</p>")
+        self.assertEqual(html, "<title>Home</title><p>hi</p>")
+
+    def test_values_are_not_rescanned(self):
+        template = compile_template("{{ Content }}|{{ Title }}")
+        html = template.render(Title="T", Content="{{ Title }}")
+        self.assertEqual(html, "{{ Title }}|T")
+
+    def test_basepath_is_applied_at_compile_time(self):
+        template = compile_template('<link href="/index.css" /><img src="/a.png" />{{ Content }}', "/site/")
+        self.assertEqual(template.segments[0], '<link href="/site/index.css" /><img src="/site/a.png" />')
+        self.assertEqual(template.render(Content='<a href="/x">x</a>'), template.segments[0] + '<a href="/x">x</a>')
+
+    def test_only_site_absolute_attributes_are_rewritten(self):
+        template = compile_template('<a href="//cdn.example/x.js">/</a><a href="https://x.org/">href="/</a>{{ Content }}', "/site/")
+        self.assertEqual(template.segments[0], '<a href="//cdn.example/x.js">/</a><a href="https://x.org/">href="/</a>')
+
+    def test_write_streams_callable_values(self):
+        template = compile_template("<title>{{ Title }}</title>{{ Content }}<footer/>")
+        chunks = []
+        template.write(chunks.append, Title="Home", Content=lambda write: write("<p>body</p>"))
+        self.assertEqual("".join(chunks), template.render(Title="Home", Content="<p>body</p>"))
+
+    def test_segments_must_interleave(self):
+        with self.assertRaises(ValueError):
+            CompiledTemplate(["a"], ["Title"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+from builder import Site
+from manifest import BuildManifest, hash_file
+from watch import changed_paths, snapshot
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.write("./template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("./content/index.md", "# Home\n\nWelcome")
+        self.write("./content/blog/post.md", "# Post\n\nHello")
+        self.write("./static/index.css", "body {}")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_snapshot_and_changed_paths(self):
+        before = snapshot(["./content", "./template.html"])
+        self.assertIn("./content/blog/post.md", before)
+        self.assertIn("./template.html", before)
+        self.write("./content/blog/post.md", "# Post\n\nHello again")
+        os.remove("./content/index.md")
+        self.write("./content/new.md", "# New")
+        after = snapshot(["./content", "./template.html"])
+        self.assertEqual(
+            changed_paths(before, after),
+            {"./content/blog/post.md", "./content/index.md", "./content/new.md"},
+        )
+
+    def site(self):
+        return Site(cache_dir=None)
+
+    def test_rebuild_is_dependency_aware(self):
+        site = self.site()
+        site.manifest = BuildManifest(hash_file("./template.html"), "/")
+        site.rebuild({"./template.html", "./static/index.css"})
+        self.assertEqual(sorted(site.manifest.pages), ["./content/blog/post.md", "./content/index.md"])
+        self.assertEqual(self.read("./docs/index.css"), "body {}")
+        os.utime("./docs/index.html", (0, 0))
+
+        self.write("./content/blog/post.md", "# Post\n\nEdited")
+        site.rebuild({"./content/blog/post.md"})
+        self.assertIn("Edited", self.read("./docs/blog/post.html"))
+        self.assertEqual(os.path.getmtime("./docs/index.html"), 0)
+
+        os.remove("./content/blog/post.md")
+        site.rebuild({"./content/blog/post.md"})
+        self.assertFalse(os.path.exists("./docs/blog/post.html"))
+        self.assertNotIn("./content/blog/post.md", site.manifest.pages)
+
+    def test_template_change_recompiles(self):
+        site = self.site()
+        site.build()
+        self.write("./template.html", "<h1>{{ Title }}</h1>{{ Content }}")
+        site.rebuild({"./template.html"})
+        self.assertTrue(self.read("./docs/index.html").startswith("<h1>Home</h1>"))
+
+    def test_failed_page_is_not_recorded(self):
+        site = self.site()
+        site.build()
+        self.write("./content/broken.md", "no title")
+        site.rebuild({"./content/broken.md"})
+        self.assertNotIn("./content/broken.md", site.manifest.pages)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -79,12 +79,76 @@ def split_nodes_link(old_nodes):
     return new_nodes
 
 
+TEXT_DELIMITERS = (("`", TextType.CODE), ("**", TextType.BOLD), ("*", TextType.ITALIC))
+
+_inline_patterns = {}
+
+def inline_pattern(delimiters):
+    pattern = _inline_patterns.get(delimiters)
+    if pattern is None:
+        tokens = sorted({delimiter for delimiter, _ in delimiters}, key=len, reverse=True)
+        pattern = re.compile(
+            r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
+            r"|(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
+            r"|(" + "|".join(re.escape(token) for token in tokens) + ")"
+        )
+        _inline_patterns[delimiters] = pattern
+    return pattern
+
+# Splits text into inline nodes in one left-to-right regex scan. Images and
+# links cut the text into runs; delimiter tokens found inside a run are then
+# resolved by priority, which gives the same result as applying
+# split_nodes_image, split_nodes_link and split_nodes_delimiter in order.
+def tokenize_inline(text, delimiters, make_node=TextNode):
+    nodes = []
+    run_start = 0
+    tokens = []
+    found_span = False
+    for match in inline_pattern(delimiters).finditer(text):
+        delimiter = match.group(5)
+        if delimiter is not None:
+            tokens.append((match.start(), delimiter))
+            continue
+        if match.start() > run_start:
+            _resolve_run(text, run_start, match.start(), tokens, delimiters, 0, make_node, nodes)
+        tokens = []
+        if match.group(1) is not None:
+            nodes.append(make_node(match.group(1), TextType.IMAGE, match.group(2)))
+        else:
+            nodes.append(make_node(match.group(3), TextType.LINK, match.group(4)))
+        run_start = match.end()
+        found_span = True
+    if len(text) > run_start or not found_span:
+        _resolve_run(text, run_start, len(text), tokens, delimiters, 0, make_node, nodes)
+    return nodes
+
+def _resolve_run(text, start, end, tokens, delimiters, level, make_node, nodes):
+    while level < len(delimiters):
+        delimiter, text_type = delimiters[level]
+        if any(token == delimiter for _, token in tokens):
+            break
+        level += 1
+    else:
+        nodes.append(make_node(text[start:end], TextType.TEXT))
+        return
+    cuts = [position for position, token in tokens if token == delimiter]
+    if len(cuts) % 2 == 1:
+        raise Exception("Invalid Markdown syntax: unmatched delimiter")
+    cuts.append(end)
+    part_start = start
+    index = 0
+    for i, cut in enumerate(cuts):
+        inner = []
+        while index < len(tokens) and tokens[index][0] < cut:
+            if tokens[index][0] >= part_start:
+                inner.append(tokens[index])
+            index += 1
+        if cut > part_start:
+            if i % 2 == 1:
+                nodes.append(make_node(text[part_start:cut], text_type))
+            else:
+                _resolve_run(text, part_start, cut, inner, delimiters, level + 1, make_node, nodes)
+        part_start = cut + len(delimiter)
+
 def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    
-    return nodes
\ No newline at end of file
+    return tokenize_inline(text, TEXT_DELIMITERS)
\ No newline at end of file
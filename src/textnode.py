@@ -12,6 +12,8 @@ class TextType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -27,21 +29,29 @@ class TextNode:
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
     
-def text_node_to_html_node(text_node):
-    
+# `resolve`, when given, maps every link and image URL as its node is built;
+# `image_props` returns extra attributes for an image from its source URL.
+def text_node_to_html_node(text_node, resolve=None, image_props=None):
+    return html_node_for(text_node.text, text_node.text_type, text_node.url, resolve, image_props)
 
-    if text_node.text_type == TextType.TEXT:
-            return LeafNode(None, text_node.text)
-    elif text_node.text_type == TextType.BOLD:
-        return LeafNode("b", text_node.text)
-    elif text_node.text_type == TextType.ITALIC:
-        return LeafNode("i", text_node.text)
-    elif text_node.text_type == TextType.CODE:
-        return LeafNode("code", text_node.text)
-    elif text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
-    elif text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url,"alt": text_node.text})
+def html_node_for(text, text_type, url=None, resolve=None, image_props=None):
+    source_url = url
+    if resolve is not None and url is not None:
+        url = resolve(url)
+    if text_type == TextType.TEXT:
+        return LeafNode(None, text)
+    elif text_type == TextType.BOLD:
+        return LeafNode("b", text)
+    elif text_type == TextType.ITALIC:
+        return LeafNode("i", text)
+    elif text_type == TextType.CODE:
+        return LeafNode("code", text)
+    elif text_type == TextType.LINK:
+        return LeafNode("a", text, {"href": url})
+    elif text_type == TextType.IMAGE:
+        props = {"src": url,"alt": text}
+        if image_props is not None:
+            props.update(image_props(source_url))
+        return LeafNode("img", "", props)
     else:
-        raise Exception(f"Unknown TextType: {text_node.text_type}")
-        
\ No newline at end of file
+        raise Exception(f"Unknown TextType: {text_type}")
@@ -0,0 +1,49 @@
+import os
+import time
+
+
+def snapshot(roots):
+    state = {}
+    for root in roots:
+        if os.path.isfile(root):
+            stat = os.stat(root)
+            state[root] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+def changed_paths(old, new):
+    changed = {path for path in new if old.get(path) != new[path]}
+    changed.update(path for path in old if path not in new)
+    return changed
+
+
+def wait_for_quiet(roots, state, debounce):
+    while True:
+        time.sleep(debounce)
+        latest = snapshot(roots)
+        if latest == state:
+            return state
+        state = latest
+
+
+def watch(roots, on_change, interval=0.5, debounce=0.2):
+    state = snapshot(roots)
+    while True:
+        time.sleep(interval)
+        current = snapshot(roots)
+        if current == state:
+            continue
+        current = wait_for_quiet(roots, current, debounce)
+        changed = changed_paths(state, current)
+        state = current
+        if changed:
+            on_change(changed)